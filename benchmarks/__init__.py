@@ -0,0 +1,6 @@
+"""Offline benchmarks for the dashboard's data paths.
+
+``python -m benchmarks.run`` generates synthetic catalogs (see
+``benchmarks.synthetic``), loads them into the SQLite stand-in for Snowflake
+and times each page's data path headlessly.
+"""
@@ -0,0 +1,291 @@
+"""Time each dashboard page's data path against synthetic catalogs.
+
+Usage::
+
+    python -m benchmarks.run                         # 1k, 100k and 1M products
+    python -m benchmarks.run --rows 1000 100000 --json results.json
+    python -m benchmarks.run --baseline results.json # exit 1 on regressions
+
+Every case runs the same calls a page makes (queries, snapshot filters,
+search, aggregates and figure construction) without Streamlit and without
+its caches, so the numbers are the cold cost a cache miss pays. The search,
+filter, product and similarity indexes are built before any page case is
+timed, as a running dashboard has them; their build cost is reported by the
+``* index build`` cases. Latency is the median of ``--repeat`` runs; peak memory is the tracemalloc peak of one
+extra run, measured separately so tracing does not skew the timings.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks import synthetic
+from dashboard import figures, history, quality, queries
+from dashboard.aggregates import AggregateStore
+from dashboard.tenants import CompanyData
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+SIZES = (1_000, 100_000, 1_000_000)
+REPEAT = 5
+PAGE_SIZE = 25
+
+# Regressions are flagged only above this many milliseconds, below that it is noise
+MIN_REGRESSION_MS = 5.0
+
+
+def _search_terms(data, table, column):
+    """A word, a two-word query and a prefix taken from a row in the middle of ``table``."""
+    frame = data.snapshots[table].search_frame()
+    words = str(frame[column].iloc[len(frame) // 2]).lower().split()
+    return [words[0], " ".join(words[:2]), words[0][:3]]
+
+
+def case_snapshot_load(data):
+    fresh = CompanyData(data.company, data.backend)
+    fresh.refresh(background=False)
+
+
+def case_search_index_build(data):
+    for table in queries.TABLES:
+        fresh = CompanyData(data.company, data.backend)
+        fresh.snapshots[table].refresh(data.backend)
+        fresh.search_index(table)
+
+
+def case_overview(data):
+    aggregates = AggregateStore.build(data.backend)
+    aggregates.overview_metrics()
+    queries.recent_updates(data.backend, limit=5)
+    for chart in ("segments", "categories", "segment_comparison"):
+        figures.build("Overview", chart, aggregates)
+
+
+def case_subsidiaries_browse(data):
+    spec = queries.SUBSIDIARIES
+    segments = tuple(data.filter_index(spec.name).values["BUSINESS_SEGMENT"][:3])
+    total = data.filter_index(spec.name).count((("BUSINESS_SEGMENT", segments),))
+    queries.select_rows(
+        data.backend, spec, queries.SUBSIDIARY_CARD_COLUMNS,
+        filters={"BUSINESS_SEGMENT": segments}, limit=PAGE_SIZE, offset=total // 2
+    )
+
+
+def case_subsidiaries_search(data):
+    spec = queries.SUBSIDIARIES
+    index = data.search_index(spec.name)
+    for term in _search_terms(data, spec.name, "DESCRIPTION"):
+        index.count(term)
+        ids = index.search(term, limit=PAGE_SIZE)
+        queries.rows_by_id(data.backend, spec, queries.SUBSIDIARY_CARD_COLUMNS, tuple(ids.tolist()))
+
+
+def case_products_browse(data):
+    spec = queries.PRODUCTS
+    filter_index = data.filter_index(spec.name)
+    segments = tuple(filter_index.values["BUSINESS_SEGMENT"][:2])
+    categories = tuple(filter_index.values["PRODUCT_SERVICE_CATEGORY"][:5])
+    filters = {"BUSINESS_SEGMENT": segments, "PRODUCT_SERVICE_CATEGORY": categories}
+    total = filter_index.count(tuple(filters.items()))
+    queries.select_rows(
+        data.backend, spec, queries.PRODUCT_CARD_COLUMNS, filters=filters, limit=PAGE_SIZE, offset=total // 2
+    )
+
+
+def case_filter_index_build(data):
+    for table in queries.TABLES:
+        fresh = CompanyData(data.company, data.backend)
+        fresh.snapshots[table].refresh(data.backend)
+        fresh.filter_index(table)
+
+
+def case_filter_change(data):
+    """Each selection of one segment and ten categories, as a user stepping through them."""
+    filter_index = data.filter_index(queries.PRODUCTS.name)
+    categories = filter_index.values["PRODUCT_SERVICE_CATEGORY"]
+    for segment in filter_index.values["BUSINESS_SEGMENT"]:
+        for start in range(0, len(categories), 10):
+            filters = (("BUSINESS_SEGMENT", (segment,)), ("PRODUCT_SERVICE_CATEGORY", tuple(categories[start:start + 10])))
+            filter_index.count(filters)
+            filter_index.mask(filters)
+
+
+def case_similarity_index_build(data):
+    fresh = CompanyData(data.company, data.backend)
+    fresh.snapshots[queries.PRODUCTS.name].refresh(data.backend)
+    fresh.similarity_index()
+
+
+def case_similar_products(data):
+    """Similar products for ten cards, then fetching the matches as the panel does."""
+    spec = queries.PRODUCTS
+    index = data.similarity_index()
+    for product_id in index.ids[::max(len(index) // 10, 1)][:10]:
+        ids = [match_id for match_id, _ in index.similar(product_id, 5)]
+        queries.rows_by_id(data.backend, spec, queries.PRODUCT_CARD_COLUMNS, tuple(ids))
+
+
+def case_products_search(data):
+    spec = queries.PRODUCTS
+    segments = tuple(data.filter_index(spec.name).values["BUSINESS_SEGMENT"][:2])
+    index, mask = data.search_scope(spec.name, (("BUSINESS_SEGMENT", segments), ("PRODUCT_SERVICE_CATEGORY", None)))
+    for term in _search_terms(data, spec.name, "PRODUCT_SERVICE_NAME"):
+        index.count(term, mask=mask)
+        ids = index.search(term, mask=mask, limit=PAGE_SIZE)
+        queries.rows_by_id(data.backend, spec, queries.PRODUCT_CARD_COLUMNS, tuple(ids.tolist()))
+
+
+def case_quality_report(data):
+    quality.build_report(data.backend)
+
+
+def case_change_history(data):
+    """A 30-day diff of each table, logging the catalog first if this is the first run."""
+    history.install(data.backend)
+    start = synthetic.EPOCH + timedelta(days=180)
+    for spec in history.SPECS.values():
+        history.diff(data.backend, spec, start, start + timedelta(days=30))
+
+
+def case_business_segments(data):
+    aggregates = AggregateStore.build(data.backend)
+    segment = data.filter_index(queries.SUBSIDIARIES.name).values["BUSINESS_SEGMENT"][0]
+    aggregates.segment_metrics(segment)
+    subsidiaries = queries.select_rows(
+        data.backend, queries.SUBSIDIARIES,
+        ("SUBSIDIARY_ID", "COMPANY_NAME", "DESCRIPTION", "MARKET_POSITION", "WEBSITE_URL"),
+        filters={"BUSINESS_SEGMENT": (segment,)}
+    )
+    products = data.product_index()
+    for subsidiary_id in subsidiaries["SUBSIDIARY_ID"]:
+        products.count(subsidiary_id)
+    figures.build("Business Segments", "categories", aggregates, segment)
+
+
+def case_analytics(data):
+    aggregates = AggregateStore.build(data.backend)
+    for chart in ("subsidiary_completeness", "product_completeness", "portfolio"):
+        figures.build("Analytics", chart, aggregates)
+    figures.portfolio_summary(aggregates).describe()
+    aggregates.category_counts(limit=10)
+
+
+CASES = {
+    "snapshot load": case_snapshot_load,
+    "search index build": case_search_index_build,
+    "filter index build": case_filter_index_build,
+    "filter change": case_filter_change,
+    "Overview": case_overview,
+    "Subsidiaries (browse)": case_subsidiaries_browse,
+    "Subsidiaries (search)": case_subsidiaries_search,
+    "Products & Services (browse)": case_products_browse,
+    "Products & Services (search)": case_products_search,
+    "similarity index build": case_similarity_index_build,
+    "Products & Services (similar)": case_similar_products,
+    "Business Segments": case_business_segments,
+    "Analytics": case_analytics,
+    "data quality report": case_quality_report,
+    "Change History": case_change_history,
+}
+
+# Cases that rebuild everything from scratch are run fewer times
+SLOW_CASES = {"snapshot load", "search index build", "filter index build", "similarity index build",
+              "data quality report"}
+
+
+def warm_indexes(data):
+    """Build the per-version indexes the page cases share, so no timed run pays for them."""
+    for table in queries.TABLES:
+        data.search_index(table)
+        data.filter_index(table)
+    data.product_index()
+    data.similarity_index()
+
+
+def measure(case, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        case(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "peak_mb": peak / 2 ** 20}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+
+def run(sizes, repeat, cases=None):
+    results = []
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            backend = synthetic.load_backend(rows, path=str(Path(directory) / "catalog.db"))
+            data = CompanyData(backend.company, backend)
+            data.refresh(background=False)
+            print(f"\n{rows:,} products: generated and loaded in {time.perf_counter() - start:.1f}s")
+            if not cases or set(cases) - SLOW_CASES:
+                warm_indexes(data)
+            for name, case in CASES.items():
+                if cases and name not in cases:
+                    continue
+                result = measure(case, data, 1 if name in SLOW_CASES else repeat)
+                result.update(rows=rows, case=name)
+                results.append(result)
+                print(f"  {name:<30} {result['median_ms']:>10.1f} ms  {result['peak_mb']:>8.1f} MB peak")
+            print(f"  process peak RSS: {peak_rss_mb() or float('nan'):.0f} MB")
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Cases whose median latency grew beyond ``tolerance`` times the baseline."""
+    previous = {(result["rows"], result["case"]): result["median_ms"] for result in baseline}
+    slower = []
+    for result in results:
+        before = previous.get((result["rows"], result["case"]))
+        if before and result["median_ms"] > max(before * tolerance, MIN_REGRESSION_MS):
+            slower.append((result["rows"], result["case"], before, result["median_ms"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(SIZES), help="product counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--case", action="append", choices=list(CASES), help="run only these cases")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against results written by --json")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor against the baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat, cases=args.case)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        slower = regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for rows, case, before, after in slower:
+            print(f"REGRESSION {case} at {rows:,} rows: {before:.1f} ms -> {after:.1f} ms")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Synthetic Subsidiaries / Subsidiary_Products_Services data at any scale.
+
+Frames use the same columns as the tables created by
+``create_subsidiaries_table.sql`` and
+``create_subsidiary_products_services_table.sql``. Text is assembled from a
+fixed pool of generated sentences so that millions of rows take seconds,
+while the vocabulary stays large enough for search to behave realistically.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.backends import REPO_DIR, SEED_SCRIPTS, LocalBackend, split_statements
+
+SEGMENTS = (
+    "Pharmaceuticals", "Diagnostics", "Digital Health", "Research & Development",
+    "Regional Operations", "Corporate Headquarters", "Finance & Operations",
+)
+
+# Subsidiaries generated per product row, with a floor matching the sample data
+SUBSIDIARIES_PER_PRODUCT = 1 / 25
+MIN_SUBSIDIARIES = 16
+
+CATEGORY_COUNT = 60
+VOCABULARY_SIZE = 20000
+SENTENCE_POOL = 4096
+SENTENCE_WORDS = 12
+
+EPOCH = pd.Timestamp("2024-01-01")
+
+
+def _sentences(rng, count):
+    syllables = np.array(["ro", "che", "gen", "tec", "dia", "cor", "bio", "lab", "med", "ix", "on", "ta", "vi", "sa"])
+    shape = (VOCABULARY_SIZE, 3)
+    vocabulary = pd.DataFrame(syllables[rng.integers(0, len(syllables), shape)]).sum(axis=1).to_numpy()
+    words = vocabulary[rng.integers(0, VOCABULARY_SIZE, (count, SENTENCE_WORDS))]
+    return pd.Series([" ".join(row) + "." for row in words])
+
+
+def _text(rng, sentences, count, parts):
+    """``count`` strings, each ``parts`` pooled sentences joined by spaces."""
+    text = sentences.iloc[rng.integers(0, len(sentences), count)].reset_index(drop=True)
+    for _ in range(parts - 1):
+        text = text + " " + sentences.iloc[rng.integers(0, len(sentences), count)].reset_index(drop=True)
+    return text
+
+
+def _timestamps(rng, count):
+    created = EPOCH + pd.to_timedelta(rng.integers(0, 365 * 86400, count), unit="s")
+    updated = created + pd.to_timedelta(rng.integers(0, 180 * 86400, count), unit="s")
+    return created, updated
+
+
+def subsidiaries(count, seed=0):
+    rng = np.random.default_rng(seed)
+    sentences = _sentences(rng, SENTENCE_POOL)
+    ids = np.arange(1, count + 1)
+    names = pd.Series(ids).map("Subsidiary {:07d} Ltd.".format)
+    created, updated = _timestamps(rng, count)
+    return pd.DataFrame({
+        "SUBSIDIARY_ID": ids,
+        "COMPANY_NAME": names,
+        "BUSINESS_SEGMENT": np.array(SEGMENTS)[rng.integers(0, len(SEGMENTS), count)],
+        "DESCRIPTION": _text(rng, sentences, count, 6),
+        "KEY_PRODUCTS_SERVICES": _text(rng, sentences, count, 1),
+        "MARKET_POSITION": _text(rng, sentences, count, 1),
+        # Roughly one in ten without a website, like the completeness checks expect
+        "WEBSITE_URL": np.where(rng.random(count) < 0.9, "https://example.com/" + pd.Series(ids).astype(str), ""),
+        "CREATED_DATE": created,
+        "LAST_UPDATED": updated,
+    })
+
+
+def products(count, subsidiary_frame, seed=1):
+    rng = np.random.default_rng(seed)
+    sentences = _sentences(rng, SENTENCE_POOL)
+    ids = np.arange(1, count + 1)
+    owners = subsidiary_frame.iloc[rng.integers(0, len(subsidiary_frame), count)].reset_index(drop=True)
+    categories = pd.Series(np.arange(CATEGORY_COUNT)).map("Category {:02d}".format).to_numpy()
+    created, updated = _timestamps(rng, count)
+    return pd.DataFrame({
+        "PRODUCT_SERVICE_ID": ids,
+        "SUBSIDIARY_ID": owners["SUBSIDIARY_ID"],
+        "SUBSIDIARY_NAME": owners["COMPANY_NAME"],
+        "BUSINESS_SEGMENT": owners["BUSINESS_SEGMENT"],
+        # Skewed so a few categories dominate, as in the real catalog
+        "PRODUCT_SERVICE_CATEGORY": categories[(rng.zipf(1.3, count) - 1) % CATEGORY_COUNT],
+        "PRODUCT_SERVICE_NAME": _text(rng, sentences, count, 1).str.split(" ", n=3).str[:3].str.join(" ")
+                                + " " + pd.Series(ids).astype(str),
+        "DESCRIPTION": _text(rng, sentences, count, 4),
+        "TARGET_MARKET": _text(rng, sentences, count, 1),
+        "KEY_FEATURES": _text(rng, sentences, count, 2),
+        "PRODUCT_URL": np.where(rng.random(count) < 0.8, "https://example.com/p/" + pd.Series(ids).astype(str), ""),
+        "CREATED_DATE": created,
+        "LAST_UPDATED": updated,
+    })
+
+
+def catalog(product_count, seed=0):
+    """Return (subsidiaries, products) frames for a catalog of ``product_count`` products."""
+    subsidiary_count = max(MIN_SUBSIDIARIES, int(product_count * SUBSIDIARIES_PER_PRODUCT))
+    subsidiary_frame = subsidiaries(subsidiary_count, seed=seed)
+    return subsidiary_frame, products(product_count, subsidiary_frame, seed=seed + 1)
+
+
+def schema_script():
+    """The CREATE TABLE statements from the seed scripts, without their sample rows."""
+    statements = []
+    for script in SEED_SCRIPTS:
+        text = (REPO_DIR / script).read_text(encoding="utf-8")
+        statements += [
+            statement for statement in split_statements(text)
+            if statement.lstrip().upper().startswith(("USE ", "CREATE "))
+        ]
+    return ";\n".join(statements) + ";"
+
+
+def load_backend(product_count, path=":memory:", seed=0):
+    """A ``LocalBackend`` holding a synthetic catalog of ``product_count`` products."""
+    backend = LocalBackend(path)
+    backend.run_script(schema_script())
+    subsidiary_frame, product_frame = catalog(product_count, seed=seed)
+    backend.insert_rows("Subsidiaries", subsidiary_frame)
+    backend.insert_rows("Subsidiary_Products_Services", product_frame)
+    return backend
@@ -0,0 +1,57 @@
+-- Roche Group Aggregate Views
+-- Segment/category aggregates shared by the dashboard's Overview, Business Segments
+-- and Analytics pages, exposed as views for other consumers of the same numbers.
+-- Run after create_subsidiaries_table.sql and create_subsidiary_products_services_table.sql
+USE DATABASE Roche_Demo;
+USE SCHEMA Roche;
+
+-- Products and product URL coverage per business segment and category
+CREATE OR REPLACE VIEW Segment_Category_Summary AS
+SELECT
+    business_segment,
+    product_service_category,
+    COUNT(*) AS product_count,
+    COUNT(product_service_name) AS named_product_count,
+    SUM(CASE WHEN product_url IS NOT NULL AND product_url <> '' THEN 1 ELSE 0 END) AS has_product_url
+FROM Subsidiary_Products_Services
+GROUP BY business_segment, product_service_category;
+
+-- Subsidiaries and website coverage per business segment
+CREATE OR REPLACE VIEW Segment_Subsidiary_Summary AS
+SELECT
+    business_segment,
+    COUNT(*) AS subsidiary_count,
+    SUM(CASE WHEN website_url IS NOT NULL AND website_url <> '' THEN 1 ELSE 0 END) AS has_website
+FROM Subsidiaries
+GROUP BY business_segment;
+
+-- Products/services per subsidiary, joined on the subsidiary_id foreign key
+CREATE OR REPLACE VIEW Subsidiary_Product_Counts AS
+SELECT
+    s.subsidiary_id,
+    s.company_name,
+    COUNT(p.product_service_id) AS product_count
+FROM Subsidiaries s
+LEFT JOIN Subsidiary_Products_Services p ON p.subsidiary_id = s.subsidiary_id
+GROUP BY s.subsidiary_id, s.company_name;
+
+-- Percentage of rows with each checked field populated
+CREATE OR REPLACE VIEW Field_Completeness AS
+SELECT 'Subsidiaries' AS table_name, 'Company Name' AS field, COUNT(company_name) * 100.0 / NULLIF(COUNT(*), 0) AS completeness FROM Subsidiaries
+UNION ALL
+SELECT 'Subsidiaries', 'Description', COUNT(description) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiaries
+UNION ALL
+SELECT 'Subsidiaries', 'Market Position', COUNT(market_position) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiaries
+UNION ALL
+SELECT 'Subsidiaries', 'Website URL', SUM(CASE WHEN website_url IS NOT NULL AND website_url <> '' THEN 1 ELSE 0 END) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiaries
+UNION ALL
+SELECT 'Subsidiary_Products_Services', 'Product Name', COUNT(product_service_name) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiary_Products_Services
+UNION ALL
+SELECT 'Subsidiary_Products_Services', 'Description', COUNT(description) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiary_Products_Services
+UNION ALL
+SELECT 'Subsidiary_Products_Services', 'Target Market', COUNT(target_market) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiary_Products_Services
+UNION ALL
+SELECT 'Subsidiary_Products_Services', 'Product URL', SUM(CASE WHEN product_url IS NOT NULL AND product_url <> '' THEN 1 ELSE 0 END) * 100.0 / NULLIF(COUNT(*), 0) FROM Subsidiary_Products_Services;
+
+-- Display completion message
+SELECT 'Aggregate views created successfully!' AS Status;
@@ -6,6 +6,7 @@ USE SCHEMA Roche;
 -- Create Subsidiary_Products_Services table
 CREATE OR REPLACE TABLE Subsidiary_Products_Services (
     product_service_id INT AUTOINCREMENT PRIMARY KEY,
+    subsidiary_id INT REFERENCES Subsidiaries (subsidiary_id),
     subsidiary_name VARCHAR(100) NOT NULL,
     business_segment VARCHAR(50) NOT NULL,
     product_service_category VARCHAR(100) NOT NULL,
@@ -82,6 +83,12 @@ INSERT INTO Subsidiary_Products_Services (subsidiary_name, business_segment, pro
 
 ('Roche (China) Holding Ltd.', 'Regional Operations', 'Commercial Services', 'China Innovation Center', 'Comprehensive innovation hub providing research, development, and commercialization support for the rapidly growing Chinese healthcare market.', 'Healthcare innovations targeting Chinese patients', 'Local innovation, regulatory support, market development, clinical research capabilities', 'https://www.roche.com.cn');
 
+-- Link each product to its subsidiary record (run create_subsidiaries_table.sql first)
+UPDATE Subsidiary_Products_Services
+SET subsidiary_id = s.subsidiary_id
+FROM Subsidiaries s
+WHERE s.company_name = Subsidiary_Products_Services.subsidiary_name;
+
 -- Display summary of inserted product data
 SELECT 
     business_segment,
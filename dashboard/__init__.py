@@ -0,0 +1,6 @@
+"""Data access and caching helpers for the subsidiaries dashboard.
+
+The Streamlit entry point (``Roche_subsidiaries_dashboard.py``) only deals
+with layout; everything that talks to Snowflake or shapes data lives here so
+it can be exercised headlessly against the local SQLite stand-in.
+"""
@@ -0,0 +1,81 @@
+"""Materialized aggregates shared by the Overview, Business Segments and Analytics pages.
+
+``AggregateStore.build`` runs a handful of GROUP BY queries once per data
+version. Everything the chart pages draw is derived from these small frames
+(a few rows per segment or category), so no page touches row-level data to
+produce a chart. ``create_aggregate_views.sql`` defines the same aggregates
+as Snowflake views for use outside the dashboard.
+"""
+from dashboard import queries, telemetry
+
+
+class AggregateStore:
+    def __init__(self, segment_categories, segment_subsidiaries, completeness):
+        # BUSINESS_SEGMENT, PRODUCT_SERVICE_CATEGORY, PRODUCT_COUNT, NAMED_PRODUCT_COUNT, HAS_PRODUCT_URL
+        self.segment_categories = segment_categories
+        # BUSINESS_SEGMENT, SUBSIDIARY_COUNT, HAS_WEBSITE
+        self.segment_subsidiaries = segment_subsidiaries
+        # table name -> {field label: percent populated}
+        self.completeness = completeness
+
+    @classmethod
+    def build(cls, backend):
+        with telemetry.stage("aggregate"):
+            return cls(
+                segment_categories=queries.segment_category_counts(backend),
+                segment_subsidiaries=queries.segment_subsidiary_counts(backend),
+                completeness={
+                    queries.SUBSIDIARIES.name: queries.completeness(
+                        backend, queries.SUBSIDIARIES, queries.SUBSIDIARY_COMPLETENESS_FIELDS
+                    ),
+                    queries.PRODUCTS.name: queries.completeness(
+                        backend, queries.PRODUCTS, queries.PRODUCT_COMPLETENESS_FIELDS
+                    ),
+                },
+            )
+
+    def overview_metrics(self):
+        return {
+            'TOTAL_SUBSIDIARIES': int(self.segment_subsidiaries['SUBSIDIARY_COUNT'].sum()),
+            'BUSINESS_SEGMENTS': len(self.segment_subsidiaries),
+            'PRODUCT_CATEGORIES': self.segment_categories['PRODUCT_SERVICE_CATEGORY'].nunique(),
+            'TOTAL_PRODUCTS': int(self.segment_categories['PRODUCT_COUNT'].sum()),
+        }
+
+    def segment_counts(self):
+        """Subsidiaries per segment, largest first."""
+        return self.segment_subsidiaries.sort_values(
+            ['SUBSIDIARY_COUNT', 'BUSINESS_SEGMENT'], ascending=[False, True], ignore_index=True
+        )[['BUSINESS_SEGMENT', 'SUBSIDIARY_COUNT']]
+
+    def category_counts(self, segment=None, limit=None):
+        """Products per category (optionally within one segment), largest first."""
+        frame = self.segment_categories
+        if segment is not None:
+            frame = frame[frame['BUSINESS_SEGMENT'] == segment]
+        counts = (
+            frame.groupby('PRODUCT_SERVICE_CATEGORY', as_index=False)['PRODUCT_COUNT'].sum()
+            .sort_values(['PRODUCT_COUNT', 'PRODUCT_SERVICE_CATEGORY'], ascending=[False, True], ignore_index=True)
+        )
+        return counts if limit is None else counts.head(limit)
+
+    def segment_summary(self):
+        """Per-segment subsidiary, website, product and category counts.
+
+        Segments present in only one table are kept with zeros for the other.
+        """
+        products = self.segment_categories.groupby('BUSINESS_SEGMENT').agg(
+            PRODUCT_COUNT=('NAMED_PRODUCT_COUNT', 'sum'),
+            CATEGORY_COUNT=('PRODUCT_SERVICE_CATEGORY', 'nunique'),
+        )
+        summary = self.segment_subsidiaries.set_index('BUSINESS_SEGMENT').join(products, how='outer')
+        return summary.fillna(0).astype(int).sort_index().reset_index()
+
+    def segment_metrics(self, segment):
+        subsidiaries = self.segment_subsidiaries[self.segment_subsidiaries['BUSINESS_SEGMENT'] == segment]
+        products = self.segment_categories[self.segment_categories['BUSINESS_SEGMENT'] == segment]
+        return {
+            'SUBSIDIARIES': int(subsidiaries['SUBSIDIARY_COUNT'].sum()),
+            'PRODUCTS': int(products['PRODUCT_COUNT'].sum()),
+            'CATEGORIES': len(products),
+        }
@@ -0,0 +1,268 @@
+"""Read-only JSON API over the dashboard's data.
+
+Usage::
+
+    python -m dashboard.api                   # Snowflake, settings from .streamlit/secrets.toml
+    python -m dashboard.api --local --port 8600
+
+Endpoints (all GET, all accept ``company=DATABASE.SCHEMA``):
+
+* ``/subsidiaries?segment=...&q=...&limit=25&offset=0``
+* ``/products?segment=...&category=...&subsidiary=...&target_market=...&q=...``
+* ``/segments/{name}``: counts, categories and subsidiaries of one segment
+* ``/analytics/completeness``: field completeness per table
+
+Filter parameters may repeat and are ORed within a parameter, ANDed across
+them. ``q`` is a ranked search, as in the dashboard's search boxes.
+
+The API reads what the dashboard reads: the same company partitions
+(snapshots, filter and search indexes, shared with the dashboard through the
+on-disk snapshots), the same queries behind a ``ResultCache`` and the same
+``AggregateStore``. Every response carries the data version as its ETag and
+answers ``If-None-Match`` with 304; rendered bodies are cached per URL and
+data version, so repeated requests touch neither the warehouse nor pandas.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from dashboard import queries
+from dashboard.aggregates import AggregateStore
+from dashboard.backends import COMPANIES_MAX_AGE, SNAPSHOT_DIR, connect, default_company, find_company, local_mode
+from dashboard.result_cache import CachingBackend, ResultCache
+from dashboard.tenants import CompanyCache
+
+logger = logging.getLogger("dashboard.api")
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 500
+
+# Query parameter -> filter column, per table
+FILTER_PARAMETERS = {
+    queries.SUBSIDIARIES.name: {"segment": "BUSINESS_SEGMENT"},
+    queries.PRODUCTS.name: {
+        "segment": "BUSINESS_SEGMENT",
+        "category": "PRODUCT_SERVICE_CATEGORY",
+        "subsidiary": "SUBSIDIARY_NAME",
+        "target_market": "TARGET_MARKET",
+    },
+}
+
+ROW_COLUMNS = {
+    queries.SUBSIDIARIES.name: queries.SUBSIDIARY_CARD_COLUMNS,
+    queries.PRODUCTS.name: queries.PRODUCT_CARD_COLUMNS,
+}
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def records(frame):
+    """``frame`` as a list of dicts with missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def etag(version):
+    return '"' + hashlib.sha256(repr(version).encode()).hexdigest()[:32] + '"'
+
+
+def _int_parameter(params, name, default, maximum=None):
+    try:
+        value = int(params.get(name, [default])[-1])
+    except ValueError:
+        raise APIError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer") from None
+    if maximum is None and value < 0:
+        raise APIError(HTTPStatus.BAD_REQUEST, f"{name} must be >= 0")
+    if maximum is not None and not 0 <= value <= maximum:
+        raise APIError(HTTPStatus.BAD_REQUEST, f"{name} must be between 0 and {maximum}")
+    return value
+
+
+class DataAPI:
+    def __init__(self, backend, snapshot_dir=None, cache=None):
+        self.backend = backend
+        self.companies = CompanyCache(backend, snapshot_dir=snapshot_dir)
+        self.cache = ResultCache() if cache is None else cache
+        self.routes = {
+            "subsidiaries": self.subsidiaries,
+            "products": self.products,
+            "segments": self.segment,
+            "analytics": self.analytics,
+        }
+
+    def handle(self, path, if_none_match=None):
+        """Answer a GET for ``path`` (with query string); returns (status, headers, body)."""
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        params = parse_qs(url.query)
+        try:
+            route = self.routes.get(parts[0]) if parts else None
+            if route is None:
+                raise APIError(HTTPStatus.NOT_FOUND, f"No such endpoint: {url.path}")
+            company = self._company(params)
+            data = self.companies.get(company)
+            version = data.refresh(background=True)
+            self.companies.evict()
+            tag = etag(version)
+            headers = {"ETag": tag, "Cache-Control": "no-cache"}
+            if if_none_match and tag in [value.strip() for value in if_none_match.split(",")]:
+                return HTTPStatus.NOT_MODIFIED, headers, b""
+            key = ("api", version, tuple(parts), tuple(sorted((name, tuple(values)) for name, values in params.items())))
+            body = self.cache.get(key, lambda: self._render(route(data, version, parts[1:], params)))
+            return HTTPStatus.OK, dict(headers, **{"Content-Type": "application/json"}), body
+        except APIError as error:
+            return error.status, {"Content-Type": "application/json"}, self._render({"error": str(error)})
+        except Exception:
+            # Details go to the log only; clients get a generic JSON error
+            logger.exception("Error answering %s", path)
+            return (
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"Content-Type": "application/json"},
+                self._render({"error": "Internal server error"}),
+            )
+
+    def _render(self, payload):
+        return json.dumps(payload, default=_json_default).encode()
+
+    def _company(self, params):
+        # Resolved through discovery, as the dashboard's picker does, so both use the same snapshots and cache keys
+        companies = self.cache.get(("companies",), self.backend.list_companies, max_age=COMPANIES_MAX_AGE)
+        if "company" not in params:
+            return default_company(companies, self.backend.company)
+        database, _, schema = params["company"][-1].partition(".")
+        company = find_company(companies, database, schema)
+        if company is None:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Unknown company: {params['company'][-1]}")
+        return company
+
+    def _backend(self, data, version):
+        return CachingBackend(data.backend, self.cache, version)
+
+    def _aggregates(self, data, version):
+        return self.cache.get(("aggregates", version), lambda: AggregateStore.build(self._backend(data, version)))
+
+    def _rows(self, data, version, table, params):
+        spec = queries.TABLES[table]
+        columns = ROW_COLUMNS[table]
+        limit = _int_parameter(params, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+        offset = _int_parameter(params, "offset", 0)
+        filters = tuple(
+            (column, tuple(params[name]) if name in params else None)
+            for name, column in FILTER_PARAMETERS[table].items()
+        )
+        search = params.get("q", [""])[-1].strip()
+        backend = self._backend(data, version)
+        if search:
+            index, mask = data.search_scope(table, filters)
+            total = index.count(search, mask=mask)
+            ids = index.search(search, mask=mask, limit=offset + limit)[offset:]
+            rows = queries.rows_by_id(backend, spec, columns, tuple(ids.tolist())) if len(ids) else None
+        else:
+            total = data.filter_index(table).count(filters)
+            rows = queries.select_rows(
+                backend, spec, columns, filters=dict(filters), limit=limit, offset=offset
+            ) if offset < total else None
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": [] if rows is None else records(rows),
+        }
+
+    def subsidiaries(self, data, version, rest, params):
+        if rest:
+            raise APIError(HTTPStatus.NOT_FOUND, "No such endpoint")
+        return self._rows(data, version, queries.SUBSIDIARIES.name, params)
+
+    def products(self, data, version, rest, params):
+        if rest:
+            raise APIError(HTTPStatus.NOT_FOUND, "No such endpoint")
+        return self._rows(data, version, queries.PRODUCTS.name, params)
+
+    def segment(self, data, version, rest, params):
+        if len(rest) != 1:
+            raise APIError(HTTPStatus.NOT_FOUND, "Use /segments/{name}")
+        name = rest[0]
+        subsidiaries = data.snapshots[queries.SUBSIDIARIES.name].frame
+        members = subsidiaries[subsidiaries["BUSINESS_SEGMENT"] == name]
+        aggregates = self._aggregates(data, version)
+        metrics = aggregates.segment_metrics(name)
+        if not len(members) and not metrics["PRODUCTS"]:
+            raise APIError(HTTPStatus.NOT_FOUND, f"Unknown segment: {name}")
+        products = data.product_index()
+        return {
+            "segment": name,
+            "subsidiaries": metrics["SUBSIDIARIES"],
+            "products": metrics["PRODUCTS"],
+            "categories": records(aggregates.category_counts(segment=name)),
+            "subsidiary_list": [
+                {"SUBSIDIARY_ID": int(subsidiary_id), "COMPANY_NAME": company_name, "PRODUCT_COUNT": products.count(subsidiary_id)}
+                for subsidiary_id, company_name in zip(members["SUBSIDIARY_ID"], members["COMPANY_NAME"])
+            ],
+        }
+
+    def analytics(self, data, version, rest, params):
+        if rest != ["completeness"]:
+            raise APIError(HTTPStatus.NOT_FOUND, "Use /analytics/completeness")
+        return self._aggregates(data, version).completeness
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, headers, body = api.handle(self.path, self.headers.get("If-None-Match"))
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard's data as read-only JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--local", action="store_true", help="serve an SQLite copy of the seed scripts")
+    args = parser.parse_args(argv)
+
+    backend = connect(local=args.local or local_mode())
+    # The dashboard's snapshot directory, so both start from the same local data
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(DataAPI(backend, snapshot_dir=SNAPSHOT_DIR)))
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""Query backends.
+
+All dashboard SQL is written in Snowflake dialect with pyformat parameters
+(``%(name)s``). ``SnowflakeBackend`` runs it through the Streamlit Snowflake
+connection; ``LocalBackend`` rewrites the few dialect differences and runs it
+against SQLite, seeded from the repo's own ``create_*.sql`` scripts, so the
+dashboard and its query layer work offline.
+"""
+import os
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import telemetry
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+SEED_SCRIPTS = (
+    "create_subsidiaries_table.sql",
+    "create_subsidiary_products_services_table.sql",
+)
+
+DATE_COLUMNS = ("CREATED_DATE", "LAST_UPDATED")
+
+# Tables a schema must contain to be offered as a company
+COMPANY_TABLES = ("SUBSIDIARIES", "SUBSIDIARY_PRODUCTS_SERVICES")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*$")
+
+
+class Company(namedtuple("Company", ["database", "schema"])):
+    """A ``[COMPANY_NAME]_Demo`` database and its ``[COMPANY_NAME]`` schema."""
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        name = self.schema.replace("_", " ")
+        return name.title() if name.isupper() else name
+
+
+DEFAULT_COMPANY = Company("Roche_Demo", "Roche")
+
+
+def find_company(companies, database, schema):
+    """The company in ``companies`` named ``database.schema``, ignoring case; None if there is none."""
+    key = (database.upper(), schema.upper())
+    return next((company for company in companies if (company.database.upper(), company.schema.upper()) == key), None)
+
+
+def default_company(companies, home):
+    """The company served when none is chosen: ``home`` as discovered, else the first one found.
+
+    Discovery reports names as the warehouse stores them (``ROCHE_DEMO``), so
+    the discovered entry rather than ``home`` itself keys snapshots and caches.
+    """
+    return find_company(companies, home.database, home.schema) or companies[0]
+
+# Snapshots persist as memory-mapped Arrow files here, shared by the dashboard
+# and the API; set DASHBOARD_SNAPSHOT_DIR to move them
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", str(REPO_DIR / ".snapshots"))
+
+# After an hour the company list is served stale while it is rediscovered
+COMPANIES_MAX_AGE = 3600
+
+_PYFORMAT_PARAM = re.compile(r"%\((\w+)\)s")
+
+
+class SnowflakeBackend:
+    """Runs queries on Snowflake through a Streamlit ``SnowflakeConnection``.
+
+    Result caching is left to the caller, so the connection's own query cache
+    is bypassed and a plain cursor is used instead.
+    """
+
+    dialect = "snowflake"
+
+    def __init__(self, conn, database=DEFAULT_COMPANY.database, schema=DEFAULT_COMPANY.schema):
+        self.conn = conn
+        self.database = database
+        self.schema = schema
+
+    @property
+    def company(self):
+        return Company(self.database, self.schema)
+
+    def for_company(self, company):
+        """A backend sharing this connection but reading ``company``'s tables."""
+        return SnowflakeBackend(self.conn, company.database, company.schema)
+
+    def list_companies(self):
+        """Discover ``*_DEMO`` databases holding both dashboard tables.
+
+        Falls back to this backend's own company when discovery is not
+        permitted for the current role.
+        """
+        try:
+            databases = self.query(f"""
+            SELECT DATABASE_NAME
+            FROM {self.database}.INFORMATION_SCHEMA.DATABASES
+            WHERE DATABASE_NAME ILIKE '%!_DEMO' ESCAPE '!'
+            ORDER BY DATABASE_NAME
+            """)["DATABASE_NAME"]
+            databases = [name for name in databases if _IDENTIFIER.match(name)]
+            if not databases:
+                return [self.company]
+            table_list = ", ".join(f"'{table}'" for table in COMPANY_TABLES)
+            sql = "\nUNION ALL\n".join(f"""
+            SELECT '{database}' AS DATABASE_NAME, TABLE_SCHEMA
+            FROM {database}.INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_NAME IN ({table_list})
+            GROUP BY TABLE_SCHEMA
+            HAVING COUNT(DISTINCT TABLE_NAME) = {len(COMPANY_TABLES)}
+            """ for database in databases)
+            found = self.query(sql)
+        except Exception:
+            return [self.company]
+        companies = [
+            Company(row.DATABASE_NAME, row.TABLE_SCHEMA)
+            for row in found.itertuples()
+            if _IDENTIFIER.match(row.TABLE_SCHEMA)
+        ]
+        return sorted(companies) or [self.company]
+
+    def table(self, name):
+        return f"{self.database}.{self.schema}.{name}"
+
+    def query(self, sql, params=None):
+        with telemetry.stage("query", backend="snowflake") as span:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql, params or None)
+                df = cursor.fetch_pandas_all()
+            finally:
+                cursor.close()
+            telemetry.record_frame(span, df)
+            return df
+
+    def execute(self, sql, params=None):
+        """Run a statement without a result set; returns the affected row count."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params or None)
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def stage_frame(self, name, frame):
+        """Load ``frame`` into temporary table ``name`` through PUT/COPY INTO, replacing it."""
+        from snowflake.connector.pandas_tools import write_pandas
+
+        write_pandas(
+            getattr(self.conn, "raw_connection", self.conn), frame, name,
+            database=self.database, schema=self.schema,
+            auto_create_table=True, overwrite=True, table_type="temporary", quote_identifiers=False,
+        )
+
+
+class LocalBackend:
+    """SQLite stand-in for Snowflake, used for offline runs and development.
+
+    One SQLite database holds one company's tables.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path=":memory:", company=DEFAULT_COMPANY):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.company = company
+
+    def for_company(self, company):
+        if company != self.company:
+            raise KeyError(f"No local data for {company.database}.{company.schema}")
+        return self
+
+    def list_companies(self):
+        return [self.company]
+
+    @classmethod
+    def from_seed_scripts(cls, path=":memory:", directory=REPO_DIR):
+        backend = cls(path)
+        for script in SEED_SCRIPTS:
+            backend.run_script((Path(directory) / script).read_text(encoding="utf-8"))
+        return backend
+
+    def table(self, name):
+        return name
+
+    def query(self, sql, params=None):
+        params = {key: _sqlite_value(value) for key, value in (params or {}).items()}
+        with telemetry.stage("query", backend="local") as span:
+            with self._lock:
+                df = pd.read_sql_query(to_sqlite(sql), self._conn, params=params or None)
+            # Snowflake folds unquoted identifiers to upper case; SQLite keeps the declared case
+            df.columns = [column.upper() for column in df.columns]
+            for column in DATE_COLUMNS:
+                if column in df.columns:
+                    df[column] = pd.to_datetime(df[column])
+            telemetry.record_frame(span, df)
+            return df
+
+    def execute(self, sql, params=None):
+        """Run a statement without a result set; returns the affected row count."""
+        params = {key: _sqlite_value(value) for key, value in (params or {}).items()}
+        with self._lock:
+            cursor = self._conn.execute(to_sqlite(sql), params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stage_frame(self, name, frame):
+        """Load ``frame`` into temporary table ``name``, replacing it (stand-in for PUT/COPY INTO)."""
+        for identifier in [name, *frame.columns]:
+            if not _IDENTIFIER.match(identifier):
+                raise ValueError(f"Invalid identifier: {identifier!r}")
+        with self._lock:
+            self._conn.execute(f"DROP TABLE IF EXISTS temp.{name}")
+            self._conn.execute(f"CREATE TEMP TABLE {name} ({', '.join(frame.columns)})")
+        self.insert_rows(name, frame)
+
+    def insert_rows(self, table, frame):
+        """Bulk-insert ``frame`` into ``table``; columns are named as in the table."""
+        columns = list(frame.columns)
+        for name in [table, *columns]:
+            if not _IDENTIFIER.match(name):
+                raise ValueError(f"Invalid identifier: {name!r}")
+        frame = frame.copy()
+        for column in columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                frame[column] = frame[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+        frame = frame.astype(object).where(frame.notna(), None)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self._lock:
+            self._conn.executemany(sql, frame.itertuples(index=False, name=None))
+            self._conn.commit()
+
+    def run_script(self, script):
+        """Run a Snowflake DDL/DML script, skipping statements SQLite has no use for."""
+        with self._lock:
+            for statement in split_statements(script):
+                for translated in translate_statement(statement):
+                    self._conn.execute(translated)
+            self._conn.commit()
+
+
+def local_mode():
+    """Whether ``DASHBOARD_BACKEND=local`` asks for the SQLite copy of the seed scripts."""
+    return os.environ.get("DASHBOARD_BACKEND", "snowflake").lower() == "local"
+
+
+def connect(local=None, database=DEFAULT_COMPANY.database, schema=DEFAULT_COMPANY.schema):
+    """The backend for the dashboard, the API and the command-line tools.
+
+    ``local`` is an SQLite database path, or True for an in-memory copy of the
+    seed scripts. Otherwise Snowflake is used with the dashboard's connection
+    settings (``.streamlit/secrets.toml``).
+    """
+    if local is True:
+        return LocalBackend.from_seed_scripts()
+    if local:
+        return LocalBackend(local)
+    import streamlit as st
+
+    return SnowflakeBackend(st.connection("snowflake"), database, schema)
+
+
+def _sqlite_value(value):
+    # Timestamps are stored as text by the seed scripts; compare in the same format
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f").rstrip("0").rstrip(".")
+    return value
+
+
+def to_sqlite(sql):
+    sql = _PYFORMAT_PARAM.sub(r":\1", sql)
+    return re.sub(r"\bILIKE\b", "LIKE", sql, flags=re.IGNORECASE)
+
+
+def split_statements(script):
+    """Split a SQL script on semicolons, ignoring comments and quoted text."""
+    statements = []
+    current = []
+    i = 0
+    in_string = False
+    while i < len(script):
+        char = script[i]
+        if in_string:
+            current.append(char)
+            if char == "'":
+                if script.startswith("''", i):
+                    current.append("'")
+                    i += 1
+                else:
+                    in_string = False
+        elif char == "'":
+            in_string = True
+            current.append(char)
+        elif script.startswith("--", i):
+            end = script.find("\n", i)
+            i = len(script) if end == -1 else end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+_SKIPPED_PREFIXES = ("USE ", "GRANT ", "SELECT ", "CREATE DATABASE", "CREATE SCHEMA")
+
+
+def translate_statement(statement):
+    """Translate one Snowflake statement to zero or more SQLite statements."""
+    upper = " ".join(statement.split()).upper()
+    if upper.startswith(_SKIPPED_PREFIXES):
+        return []
+    prefix = []
+    match = re.match(r"CREATE\s+OR\s+REPLACE\s+TABLE\s+(\w+)", statement, flags=re.IGNORECASE)
+    if match:
+        prefix.append(f"DROP TABLE IF EXISTS {match.group(1)}")
+        statement = f"CREATE TABLE {match.group(1)}" + statement[match.end():]
+    statement = re.sub(
+        r"\bINT\s+AUTOINCREMENT\s+PRIMARY\s+KEY\b",
+        "INTEGER PRIMARY KEY AUTOINCREMENT",
+        statement,
+        flags=re.IGNORECASE,
+    )
+    statement = re.sub(r"\bCURRENT_TIMESTAMP\(\)", "CURRENT_TIMESTAMP", statement, flags=re.IGNORECASE)
+    return prefix + [statement]
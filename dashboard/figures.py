@@ -0,0 +1,182 @@
+"""Plotly figures for the chart pages, built from an ``AggregateStore``.
+
+Figures are returned as plain figure dicts without Plotly's default
+template (Streamlit applies its own theme in the browser), which cuts each
+chart's JSON payload to a fraction of its default size. Category charts
+keep the ``TOP_N`` largest categories and fold the rest into a single
+"Other" bar, so their payload stays bounded however large the catalog
+grows.
+
+``build`` looks charts up by (page, chart) in ``FIGURES``; the app memoizes
+its result per data version and filter state.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dashboard import queries, telemetry
+
+TOP_N = 10
+OTHER_LABEL = "Other"
+
+COLORS = ['#0066CC', '#003366', '#66B2FF', '#004499', '#0080FF', '#1177DD']
+
+
+def top_n(frame, label_column, value_column, limit=TOP_N):
+    """Keep the ``limit`` largest rows of ``frame`` and sum the rest into an "Other" row."""
+    frame = frame.sort_values([value_column, label_column], ascending=[False, True], ignore_index=True)
+    if len(frame) <= limit:
+        return frame[[label_column, value_column]]
+    other = pd.DataFrame({label_column: [OTHER_LABEL], value_column: [frame[value_column].iloc[limit:].sum()]})
+    return pd.concat([frame[[label_column, value_column]].head(limit), other], ignore_index=True)
+
+
+def minimal(fig):
+    """Figure dict without the default template; Streamlit themes the chart itself."""
+    fig.update_layout(template="none")
+    return fig.to_plotly_json()
+
+
+def segment_distribution(aggregates, filter_state=None):
+    segment_counts = top_n(aggregates.segment_counts(), 'BUSINESS_SEGMENT', 'SUBSIDIARY_COUNT')
+    fig = px.pie(
+        values=segment_counts['SUBSIDIARY_COUNT'],
+        names=segment_counts['BUSINESS_SEGMENT'],
+        title="Distribution of Subsidiaries",
+        color_discrete_sequence=COLORS
+    )
+    fig.update_layout(font=dict(size=12), title_font_size=16, height=400)
+    return fig
+
+
+def top_categories(aggregates, filter_state=None):
+    category_counts = top_n(aggregates.category_counts(), 'PRODUCT_SERVICE_CATEGORY', 'PRODUCT_COUNT')
+    fig = px.bar(
+        x=category_counts['PRODUCT_COUNT'],
+        y=category_counts['PRODUCT_SERVICE_CATEGORY'],
+        orientation='h',
+        title="Top Product/Service Categories",
+        color=category_counts['PRODUCT_COUNT'],
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(font=dict(size=12), title_font_size=16, height=400, showlegend=False)
+    return fig
+
+
+def segment_comparison(aggregates, filter_state=None):
+    segment_analysis = aggregates.segment_summary()
+    segment_analysis = segment_analysis[segment_analysis['SUBSIDIARY_COUNT'] > 0]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Subsidiaries',
+        x=segment_analysis['BUSINESS_SEGMENT'],
+        y=segment_analysis['SUBSIDIARY_COUNT'],
+        marker_color='#0066CC'
+    ))
+    fig.add_trace(go.Bar(
+        name='Products/Services',
+        x=segment_analysis['BUSINESS_SEGMENT'],
+        y=segment_analysis['PRODUCT_COUNT'],
+        marker_color='#66B2FF'
+    ))
+    fig.update_layout(
+        title='Subsidiaries and Products by Business Segment',
+        xaxis_title='Business Segment',
+        yaxis_title='Count',
+        barmode='group',
+        font=dict(size=12),
+        title_font_size=16,
+        height=500
+    )
+    return fig
+
+
+def segment_categories(aggregates, segment):
+    category_counts = top_n(aggregates.category_counts(segment=segment), 'PRODUCT_SERVICE_CATEGORY', 'PRODUCT_COUNT')
+    fig = px.bar(
+        x=category_counts['PRODUCT_SERVICE_CATEGORY'],
+        y=category_counts['PRODUCT_COUNT'],
+        title=f"Product Categories in {segment}",
+        color=category_counts['PRODUCT_COUNT'],
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(
+        xaxis_title="Product Category",
+        yaxis_title="Number of Products",
+        font=dict(size=12),
+        title_font_size=16,
+        height=400
+    )
+    return fig
+
+
+def _completeness(aggregates, table, title):
+    completeness_df = pd.DataFrame(list(aggregates.completeness[table].items()), columns=['Field', 'Completeness'])
+    fig = px.bar(
+        completeness_df,
+        x='Field',
+        y='Completeness',
+        title=title,
+        color='Completeness',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(height=300)
+    return fig
+
+
+def subsidiary_completeness(aggregates, filter_state=None):
+    return _completeness(aggregates, queries.SUBSIDIARIES.name, 'Subsidiaries Data Completeness (%)')
+
+
+def product_completeness(aggregates, filter_state=None):
+    return _completeness(aggregates, queries.PRODUCTS.name, 'Products Data Completeness (%)')
+
+
+def portfolio(aggregates, filter_state=None):
+    combined_summary = portfolio_summary(aggregates)
+    fig = px.scatter(
+        combined_summary.reset_index(),
+        x='Subsidiary_Count',
+        y='Product_Count',
+        size='Category_Count',
+        color='BUSINESS_SEGMENT',
+        title='Business Segment Portfolio Analysis',
+        labels={
+            'Subsidiary_Count': 'Number of Subsidiaries',
+            'Product_Count': 'Number of Products/Services',
+            'Category_Count': 'Product Categories'
+        },
+        color_discrete_sequence=COLORS
+    )
+    fig.update_layout(height=500, font=dict(size=12), title_font_size=16)
+    return fig
+
+
+def portfolio_summary(aggregates):
+    """Per-segment counts plus products per subsidiary, indexed by BUSINESS_SEGMENT."""
+    combined_summary = aggregates.segment_summary().set_index('BUSINESS_SEGMENT').rename(columns={
+        'SUBSIDIARY_COUNT': 'Subsidiary_Count',
+        'PRODUCT_COUNT': 'Product_Count',
+        'CATEGORY_COUNT': 'Category_Count'
+    })
+    combined_summary['Products_per_Subsidiary'] = combined_summary['Product_Count'] / combined_summary['Subsidiary_Count']
+    combined_summary['Products_per_Subsidiary'] = combined_summary['Products_per_Subsidiary'].replace([np.inf], 0)
+    return combined_summary
+
+
+# (page, chart) -> builder(aggregates, filter_state)
+FIGURES = {
+    ("Overview", "segments"): segment_distribution,
+    ("Overview", "categories"): top_categories,
+    ("Overview", "segment_comparison"): segment_comparison,
+    ("Business Segments", "categories"): segment_categories,
+    ("Analytics", "subsidiary_completeness"): subsidiary_completeness,
+    ("Analytics", "product_completeness"): product_completeness,
+    ("Analytics", "portfolio"): portfolio,
+}
+
+
+def build(page, chart, aggregates, filter_state=None):
+    with telemetry.stage("figure", page=page, chart=chart):
+        return minimal(FIGURES[page, chart](aggregates, filter_state))
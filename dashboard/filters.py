@@ -0,0 +1,113 @@
+"""Precomputed row sets for the directory multiselect filters.
+
+``FilterIndex`` is built once per snapshot version from a table's
+categorical columns. Each value's rows are kept as a packed bitmap (one bit
+per row) when the value is common enough for the bitmap to be the smaller
+form, and as sorted row positions otherwise, so high-cardinality columns
+such as ``SUBSIDIARY_NAME`` stay cheap. A selection ORs the values chosen
+within a column and ANDs the columns together. Results are memoized by
+filter tuple, so a rerun with unchanged filters is a dictionary lookup.
+
+Rows are in snapshot order, the same order as the table's search index, so
+a mask applies to search results directly.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ("BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY", "SUBSIDIARY_NAME", "TARGET_MARKET")
+
+# Memoized selections per index; each holds one bit per row
+MEMO_SIZE = 64
+
+
+def _bit_count(packed):
+    """Number of set bits in a packed bitmap."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(packed).sum())
+    # NumPy < 2.0 has no popcount ufunc
+    return int(np.unpackbits(packed).sum())
+
+
+class FilterIndex:
+    def __init__(self, row_count, values, row_sets):
+        self.row_count = row_count
+        # column -> sorted distinct values, the multiselect options
+        self.values = values
+        # column -> {value: packed uint8 bitmap or int32 row positions}
+        self.row_sets = row_sets
+        self._all = np.packbits(np.ones(row_count, dtype=bool))
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = self._all.nbytes + sum(
+            rows.nbytes for column_sets in row_sets.values() for rows in column_sets.values()
+        )
+
+    @classmethod
+    def from_frame(cls, frame, columns=FILTER_COLUMNS):
+        row_count = len(frame)
+        values, row_sets = {}, {}
+        for column in columns:
+            if column not in frame:
+                continue
+            codes, uniques = pd.factorize(frame[column].astype(object), sort=True)
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # Missing values (code -1) sort first and belong to no value
+            starts = np.cumsum(counts) - counts + np.count_nonzero(codes < 0)
+            column_sets = {}
+            for value, start, count in zip(uniques, starts, counts):
+                rows = order[start:start + count]
+                # 32-bit positions outweigh a bitmap once a value covers 1/32 of the rows
+                if count * 32 >= row_count:
+                    bits = np.zeros(row_count, dtype=bool)
+                    bits[rows] = True
+                    rows = np.packbits(bits)
+                column_sets[value] = rows
+            values[column] = list(uniques)
+            row_sets[column] = column_sets
+        return cls(row_count, values, row_sets)
+
+    def mask(self, filters):
+        """Boolean row mask for ``(column, values)`` filters; ``values`` of None leaves a column unfiltered."""
+        return np.unpackbits(self._select(filters)[0], count=self.row_count).view(bool)
+
+    def count(self, filters):
+        return self._select(filters)[1]
+
+    def _select(self, filters):
+        """(packed bitmap, row count) for ``filters``, memoized."""
+        key = tuple((column, tuple(values)) for column, values in filters if values is not None)
+        with self._lock:
+            selection = self._memo.get(key)
+            if selection is not None:
+                self._memo.move_to_end(key)
+                return selection
+        packed = self._all
+        for column, values in key:
+            packed = packed & self._union(column, values)
+        selection = (packed, _bit_count(packed))
+        with self._lock:
+            self._memo[key] = selection
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return selection
+
+    def _union(self, column, values):
+        column_sets = self.row_sets[column]
+        packed = np.zeros_like(self._all)
+        positions = []
+        for value in values:
+            rows = column_sets.get(value)
+            if rows is None:
+                continue
+            if rows.dtype == np.uint8:
+                packed |= rows
+            else:
+                positions.append(rows)
+        if positions:
+            rows = np.concatenate(positions)
+            np.bitwise_or.at(packed, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+        return packed
@@ -0,0 +1,265 @@
+"""Append-only change log of both dashboard tables, and diffs between two dates.
+
+Rows are updated in place, so the tables themselves only know each row's
+latest state. ``install`` adds a ``<table>_Changes`` log next to each table
+with one entry per inserted, updated or deleted row, holding the row as it
+was after the change (the last state, for deletions):
+
+* on Snowflake a stream on the table feeds a serverless task that appends
+  the stream's net changes every minute;
+* on SQLite (``DASHBOARD_BACKEND=local``) triggers append them as they happen.
+
+Only changed rows are stored, so the log grows with the edit rate rather
+than the table size. Existing rows are logged once at install time as
+inserted on their ``CREATED_DATE``; changes made before that are not known.
+
+``diff(backend, spec, start, end)`` reads only the log entries of rows that
+changed between the two times: for each, the last entry at or before
+``start`` and the last at or before ``end``. Usage::
+
+    python -m dashboard.history install
+    python -m dashboard.history install --local catalog.db
+"""
+import argparse
+import sys
+from collections import namedtuple
+
+import pandas as pd
+
+from dashboard import queries
+from dashboard.backends import DEFAULT_COMPANY, connect
+
+# label_column names a row in the diff view; columns are the tracked fields
+HistorySpec = namedtuple("HistorySpec", ["table", "id_column", "label_column", "columns"])
+
+SUBSIDIARIES = HistorySpec(
+    table=queries.SUBSIDIARIES.name,
+    id_column="SUBSIDIARY_ID",
+    label_column="COMPANY_NAME",
+    columns=(
+        "COMPANY_NAME", "BUSINESS_SEGMENT", "DESCRIPTION", "KEY_PRODUCTS_SERVICES",
+        "MARKET_POSITION", "WEBSITE_URL",
+    ),
+)
+
+PRODUCTS = HistorySpec(
+    table=queries.PRODUCTS.name,
+    id_column="PRODUCT_SERVICE_ID",
+    label_column="PRODUCT_SERVICE_NAME",
+    columns=(
+        "SUBSIDIARY_ID", "SUBSIDIARY_NAME", "BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY",
+        "PRODUCT_SERVICE_NAME", "DESCRIPTION", "TARGET_MARKET", "KEY_FEATURES", "PRODUCT_URL",
+    ),
+)
+
+SPECS = {spec.table: spec for spec in (SUBSIDIARIES, PRODUCTS)}
+
+# How often the Snowflake task drains the stream into the log
+TASK_SCHEDULE = "1 MINUTE"
+
+CHANGE_LABELS = {"INSERT": "Added", "UPDATE": "Modified", "DELETE": "Removed"}
+
+
+def log_table(spec):
+    return f"{spec.table}_Changes"
+
+
+def _logged_columns(spec):
+    return (spec.id_column, *spec.columns)
+
+
+def _column_type(column):
+    return "INT" if column.endswith("_ID") else "VARCHAR"
+
+
+def install_statements(spec, backend):
+    """SQL that creates ``spec``'s change log and starts filling it; safe to run again."""
+    table = backend.table(spec.table)
+    log = backend.table(log_table(spec))
+    columns = _logged_columns(spec)
+    column_list = ", ".join(columns)
+    baseline = f"""
+        INSERT INTO {log} (CHANGE_ACTION, CHANGED_AT, {column_list})
+        SELECT 'INSERT', COALESCE(CREATED_DATE, {{now}}), {column_list}
+        FROM {table}
+        WHERE NOT EXISTS (SELECT 1 FROM {log})
+        """
+    if backend.dialect == "sqlite":
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns)
+        trigger = f"{log_table(spec)}_{{action}}"
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS {log} (
+                CHANGE_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                CHANGE_ACTION VARCHAR(6) NOT NULL,
+                CHANGED_AT TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                {", ".join(columns)}
+            )
+            """,
+            f"CREATE INDEX IF NOT EXISTS {log}_row ON {log} ({spec.id_column}, CHANGED_AT)",
+            f"CREATE INDEX IF NOT EXISTS {log}_time ON {log} (CHANGED_AT)",
+            # The baseline runs before the triggers exist, so rows are not logged twice
+            baseline.format(now="CURRENT_TIMESTAMP"),
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger.format(action="insert")} AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {log} (CHANGE_ACTION, {column_list}) VALUES ('INSERT', {new_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger.format(action="update")} AFTER UPDATE ON {table}
+            WHEN {changed}
+            BEGIN
+                INSERT INTO {log} (CHANGE_ACTION, {column_list}) VALUES ('UPDATE', {new_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {trigger.format(action="delete")} AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {log} (CHANGE_ACTION, {column_list})
+                VALUES ('DELETE', {", ".join(f"OLD.{column}" for column in columns)});
+            END
+            """,
+        ]
+    stream = backend.table(f"{spec.table}_Change_Stream")
+    task = backend.table(f"{spec.table}_Change_Task")
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {log} (
+            CHANGE_ID INT AUTOINCREMENT PRIMARY KEY,
+            CHANGE_ACTION VARCHAR(6) NOT NULL,
+            CHANGED_AT TIMESTAMP NOT NULL,
+            {", ".join(f"{column} {_column_type(column)}" for column in columns)}
+        )
+        CLUSTER BY (CHANGED_AT)
+        """,
+        # Created before the baseline so no change falls between the two
+        f"CREATE STREAM IF NOT EXISTS {stream} ON TABLE {table}",
+        baseline.format(now="CURRENT_TIMESTAMP()::TIMESTAMP_NTZ"),
+        # An update shows up in a stream as a DELETE/INSERT pair flagged ISUPDATE; keep the INSERT half
+        f"""
+        CREATE TASK IF NOT EXISTS {task}
+            SCHEDULE = '{TASK_SCHEDULE}'
+            USER_TASK_MANAGED_INITIAL_WAREHOUSE_SIZE = 'XSMALL'
+            WHEN SYSTEM$STREAM_HAS_DATA('{stream}')
+        AS
+            INSERT INTO {log} (CHANGE_ACTION, CHANGED_AT, {column_list})
+            SELECT CASE
+                       WHEN METADATA$ACTION = 'DELETE' THEN 'DELETE'
+                       WHEN METADATA$ISUPDATE THEN 'UPDATE'
+                       ELSE 'INSERT'
+                   END,
+                   CURRENT_TIMESTAMP()::TIMESTAMP_NTZ,
+                   {column_list}
+            FROM {stream}
+            WHERE NOT (METADATA$ACTION = 'DELETE' AND METADATA$ISUPDATE)
+        """,
+        f"ALTER TASK {task} RESUME",
+    ]
+
+
+def install(backend, specs=SPECS.values()):
+    for spec in specs:
+        for statement in install_statements(spec, backend):
+            backend.execute(statement)
+
+
+def installed(backend, spec):
+    """Whether ``spec``'s change log exists for ``backend``'s company."""
+    if backend.dialect == "sqlite":
+        sql = "SELECT COUNT(*) AS FOUND FROM sqlite_master WHERE type = 'table' AND UPPER(name) = %(name)s"
+        params = {"name": log_table(spec).upper()}
+    else:
+        sql = f"""
+        SELECT COUNT(*) AS FOUND
+        FROM {backend.database}.INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = %(schema)s AND TABLE_NAME = %(name)s
+        """
+        params = {"schema": backend.schema.upper(), "name": log_table(spec).upper()}
+    return bool(backend.query(sql, params)["FOUND"].iloc[0])
+
+
+def log_watermark(backend, spec):
+    """Last CHANGE_ID and CHANGED_AT in ``spec``'s change log; moves whenever an entry is appended."""
+    sql = f"SELECT MAX(CHANGE_ID) AS LAST_CHANGE, MAX(CHANGED_AT) AS LAST_CHANGED_AT FROM {backend.table(log_table(spec))}"
+    row = backend.query(sql).iloc[0]
+    return (None if pd.isna(row["LAST_CHANGE"]) else int(row["LAST_CHANGE"])), str(row["LAST_CHANGED_AT"])
+
+
+def change_entries(backend, spec, start, end):
+    """Latest log entry at or before ``start`` (SIDE 0) and ``end`` (SIDE 1) of every row changed in between."""
+    log = backend.table(log_table(spec))
+    side = "CASE WHEN l.CHANGED_AT <= %(start)s THEN 0 ELSE 1 END"
+    sql = f"""
+    SELECT {", ".join(_logged_columns(spec))}, CHANGE_ACTION, CHANGED_AT, SIDE
+    FROM (
+        SELECT l.*,
+               {side} AS SIDE,
+               ROW_NUMBER() OVER (
+                   PARTITION BY l.{spec.id_column}, {side}
+                   ORDER BY l.CHANGED_AT DESC, l.CHANGE_ID DESC
+               ) AS POSITION
+        FROM {log} l
+        WHERE l.CHANGED_AT <= %(end)s
+          AND l.{spec.id_column} IN (
+              SELECT {spec.id_column} FROM {log} WHERE CHANGED_AT > %(start)s AND CHANGED_AT <= %(end)s
+          )
+    ) ranked
+    WHERE POSITION = 1
+    ORDER BY {spec.id_column}, SIDE
+    """
+    entries = backend.query(sql, {"start": start, "end": end})
+    entries["CHANGED_AT"] = pd.to_datetime(entries["CHANGED_AT"])
+    return entries
+
+
+def diff(backend, spec, start, end):
+    """What changed between ``start`` and ``end``, one row per added or removed
+    row and one per modified field, with the time of the latest change."""
+    entries = change_entries(backend, spec, start, end)
+    before = entries[entries["SIDE"] == 0].set_index(spec.id_column)
+    after = entries[entries["SIDE"] == 1].set_index(spec.id_column)
+    existed = (before["CHANGE_ACTION"] != "DELETE").reindex(after.index, fill_value=False)
+    exists = after["CHANGE_ACTION"] != "DELETE"
+    parts = []
+
+    def add(change, rows, field=None, old=None, new=None):
+        parts.append(pd.DataFrame({
+            "CHANGE": change,
+            "ID": rows.index,
+            # Deletions log the row's last state, so every entry carries a name
+            "NAME": rows[spec.label_column].to_numpy(),
+            "FIELD": field,
+            "BEFORE": None if old is None else old.to_numpy(),
+            "AFTER": None if new is None else new.to_numpy(),
+            "CHANGED_AT": rows["CHANGED_AT"].to_numpy(),
+        }))
+
+    add(CHANGE_LABELS["INSERT"], after[exists & ~existed])
+    add(CHANGE_LABELS["DELETE"], after[existed & ~exists])
+    modified = after[existed & exists]
+    previous = before.loc[modified.index]
+    for column in spec.columns:
+        # Rows edited and then reverted within the range drop out here
+        same = (previous[column] == modified[column]) | (previous[column].isna() & modified[column].isna())
+        add(CHANGE_LABELS["UPDATE"], modified[~same], column, previous[column][~same], modified[column][~same])
+    return pd.concat(parts, ignore_index=True).sort_values("ID", kind="stable", ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Set up the change log of the dashboard tables.")
+    parser.add_argument("command", choices=["install"])
+    parser.add_argument("--local", metavar="DATABASE", help="install into this SQLite database instead of Snowflake")
+    parser.add_argument("--database", default=DEFAULT_COMPANY.database)
+    parser.add_argument("--schema", default=DEFAULT_COMPANY.schema)
+    args = parser.parse_args(argv)
+
+    backend = connect(args.local, args.database, args.schema)
+    install(backend)
+    print(f"Change log installed for {', '.join(log_table(spec) for spec in SPECS.values())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Bulk ingestion of subsidiary and product records.
+
+Records are streamed from CSV, JSONL or Parquet files in batches. Each batch
+is staged into a temporary table (``write_pandas`` PUT/COPY INTO on
+Snowflake, a bulk insert on the local engine) and merged into the target
+table on its natural key:
+
+* new keys are inserted with ``created_date`` and ``last_updated`` set to now;
+* existing keys are updated only when a value actually changed, and then
+  only ``last_updated`` is bumped, so ``created_date`` is preserved and the
+  dashboard's incremental refresh sees just the real changes.
+
+Tables are never dropped, so loads can be repeated safely. Usage::
+
+    python -m dashboard.ingest subsidiaries subsidiaries.csv
+    python -m dashboard.ingest products products.parquet --local catalog.db
+"""
+import argparse
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import queries
+from dashboard.backends import DEFAULT_COMPANY, connect
+
+IngestSpec = namedtuple("IngestSpec", ["table", "natural_key", "columns", "after_merge"])
+
+# Link unlinked products to their subsidiary by name, as create_subsidiary_products_services_table.sql
+# does. Run after either table is loaded: products may arrive before their subsidiary.
+LINK_PRODUCTS = """
+    UPDATE {products}
+    SET SUBSIDIARY_ID = s.SUBSIDIARY_ID, LAST_UPDATED = CURRENT_TIMESTAMP
+    FROM {subsidiaries} s
+    WHERE s.COMPANY_NAME = {products_name}.SUBSIDIARY_NAME
+      AND {products_name}.SUBSIDIARY_ID IS NULL
+    """
+
+SUBSIDIARIES = IngestSpec(
+    table=queries.SUBSIDIARIES.name,
+    natural_key=("COMPANY_NAME",),
+    columns=(
+        "COMPANY_NAME", "BUSINESS_SEGMENT", "DESCRIPTION", "KEY_PRODUCTS_SERVICES",
+        "MARKET_POSITION", "WEBSITE_URL",
+    ),
+    after_merge=(LINK_PRODUCTS,),
+)
+
+PRODUCTS = IngestSpec(
+    table=queries.PRODUCTS.name,
+    natural_key=("SUBSIDIARY_NAME", "PRODUCT_SERVICE_NAME"),
+    columns=(
+        "SUBSIDIARY_NAME", "BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY", "PRODUCT_SERVICE_NAME",
+        "DESCRIPTION", "TARGET_MARKET", "KEY_FEATURES", "PRODUCT_URL",
+    ),
+    after_merge=(LINK_PRODUCTS,),
+)
+
+SPECS = {"subsidiaries": SUBSIDIARIES, "products": PRODUCTS}
+
+BATCH_SIZE = 50_000
+
+IngestResult = namedtuple("IngestResult", ["batches", "rows_read", "rows_rejected", "rows_written", "seconds"])
+
+
+def read_batches(path, batch_size=BATCH_SIZE):
+    """Yield DataFrames of up to ``batch_size`` records from a CSV, JSONL or Parquet file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=batch_size, dtype=str, keep_default_na=False, na_values=[""])
+    elif suffix in (".jsonl", ".ndjson"):
+        yield from pd.read_json(path, lines=True, chunksize=batch_size, dtype=False)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix!r} (expected .csv, .jsonl or .parquet)")
+
+
+def prepare(spec, frame):
+    """Select and order ``spec``'s columns, drop rows without a natural key and
+    keep the last record for each key. Returns (batch, rejected row count)."""
+    frame = frame.rename(columns=str.upper)
+    batch = pd.DataFrame({column: frame[column] if column in frame else None for column in spec.columns})
+    batch = batch.astype(object).where(batch.notna(), None)
+    keyed = batch[list(spec.natural_key)].notna().all(axis=1)
+    batch = batch[keyed].drop_duplicates(list(spec.natural_key), keep="last")
+    return batch, int((~keyed).sum())
+
+
+def _distinct(dialect, left, right):
+    if dialect == "sqlite":
+        return f"{left} IS NOT {right}"
+    return f"{left} IS DISTINCT FROM {right}"
+
+
+def merge_statements(spec, target, staging, dialect):
+    """SQL that upserts ``staging`` into ``target``; a MERGE on Snowflake, UPDATE + INSERT on SQLite."""
+    values = [column for column in spec.columns if column not in spec.natural_key]
+    key_match = " AND ".join(f"t.{column} = s.{column}" for column in spec.natural_key)
+    changed = " OR ".join(_distinct(dialect, f"t.{column}", f"s.{column}") for column in values)
+    columns = ", ".join(spec.columns)
+    staged = ", ".join(f"s.{column}" for column in spec.columns)
+    if dialect == "sqlite":
+        # SQLite has no MERGE: update changed rows, then insert unseen keys
+        return [
+            f"""
+            UPDATE {target} AS t
+            SET {", ".join(f"{column} = s.{column}" for column in values)}, LAST_UPDATED = CURRENT_TIMESTAMP
+            FROM {staging} s
+            WHERE {key_match} AND ({changed})
+            """,
+            f"""
+            INSERT INTO {target} ({columns}, CREATED_DATE, LAST_UPDATED)
+            SELECT {staged}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            FROM {staging} s
+            WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {key_match})
+            """,
+        ]
+    return [
+        f"""
+        MERGE INTO {target} t
+        USING {staging} s
+        ON {key_match}
+        WHEN MATCHED AND ({changed}) THEN UPDATE SET
+            {", ".join(f"{column} = s.{column}" for column in values)}, LAST_UPDATED = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN INSERT ({columns}, CREATED_DATE, LAST_UPDATED)
+            VALUES ({staged}, CURRENT_TIMESTAMP(), CURRENT_TIMESTAMP())
+        """,
+    ]
+
+
+def _prepare_target(backend, spec):
+    if backend.dialect == "sqlite":
+        # Snowflake needs no index; SQLite would otherwise scan the table per staged row
+        backend.execute(
+            f"CREATE INDEX IF NOT EXISTS {spec.table}_natural_key "
+            f"ON {spec.table} ({', '.join(spec.natural_key)})"
+        )
+
+
+def ingest(backend, spec, batches, log=None):
+    """Stage and merge each batch from ``batches`` into ``spec.table``."""
+    start = time.perf_counter()
+    staging = f"{spec.table}_STAGING"
+    target = backend.table(spec.table)
+    _prepare_target(backend, spec)
+    count = rows_read = rows_rejected = rows_written = 0
+    for frame in batches:
+        batch, rejected = prepare(spec, frame)
+        count += 1
+        rows_read += len(frame)
+        rows_rejected += rejected
+        if len(batch):
+            backend.stage_frame(staging, batch)
+            for statement in merge_statements(spec, target, backend.table(staging), backend.dialect):
+                rows_written += backend.execute(statement)
+        if log:
+            log(f"batch {count}: {rows_read:,} rows read, {rows_written:,} written")
+    for statement in spec.after_merge:
+        rows_written += backend.execute(statement.format(
+            products=backend.table(queries.PRODUCTS.name),
+            products_name=queries.PRODUCTS.name,
+            subsidiaries=backend.table(queries.SUBSIDIARIES.name),
+        ))
+    return IngestResult(count, rows_read, rows_rejected, rows_written, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load subsidiary or product records.")
+    parser.add_argument("table", choices=list(SPECS))
+    parser.add_argument("path", type=Path, help="CSV, JSONL or Parquet file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--local", metavar="DATABASE", help="load into this SQLite database instead of Snowflake")
+    parser.add_argument("--database", default=DEFAULT_COMPANY.database)
+    parser.add_argument("--schema", default=DEFAULT_COMPANY.schema)
+    args = parser.parse_args(argv)
+
+    backend = connect(args.local, args.database, args.schema)
+    result = ingest(backend, SPECS[args.table], read_batches(args.path, args.batch_size), log=print)
+    print(
+        f"Loaded {args.path} into {SPECS[args.table].table}: {result.rows_read:,} rows read, "
+        f"{result.rows_rejected:,} rejected, {result.rows_written:,} inserted or updated "
+        f"in {result.seconds:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Streamlit resources and cached data loaders shared by the dashboard pages.
+
+Streamlit re-executes the app script on every interaction, but imported
+modules run once per process; keeping the loaders here means their
+``st.cache_*`` wrappers are created once instead of on every rerun.
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from dashboard import history, quality, queries, telemetry
+from dashboard.aggregates import AggregateStore
+from dashboard.backends import COMPANIES_MAX_AGE, SNAPSHOT_DIR, connect, local_mode
+from dashboard.result_cache import CachingBackend, MemoryStore, ResultCache, redis_store
+from dashboard.tenants import CompanyCache
+
+# Database connection - USE st.cache_resource for connections
+@st.cache_resource
+def get_backend():
+    # DASHBOARD_BACKEND=local runs against an SQLite copy of the seed scripts
+    backend = connect(local=local_mode())
+    if local_mode():
+        # Log changes from the start, so the Change History page works offline too
+        history.install(backend)
+    return backend
+
+# Instrumentation - every cached loader call is timed and recorded as a cache
+# hit or miss in the current page run (see dashboard/telemetry.py)
+def cached_loader(**cache_options):
+    """``st.cache_data`` that also reports each call to the telemetry."""
+    def decorate(func):
+        return telemetry.cached(st.cache_data(**cache_options)(telemetry.cache_miss(func)))
+    return decorate
+
+# Shared results - every session (and, with DASHBOARD_RESULT_CACHE_URL pointing at
+# Redis, every worker process) reads warehouse results from one cache; identical
+# concurrent queries are sent once
+RESULT_CACHE_URL = os.environ.get("DASHBOARD_RESULT_CACHE_URL")
+RESULT_CACHE_MB = int(os.environ.get("DASHBOARD_RESULT_CACHE_MB", "256"))
+
+@st.cache_resource
+def get_result_cache():
+    store = redis_store(RESULT_CACHE_URL) if RESULT_CACHE_URL else MemoryStore(RESULT_CACHE_MB << 20)
+    return ResultCache(store)
+
+# Companies - every [COMPANY_NAME]_Demo database with both tables is offered;
+# each company's snapshots and indexes live in their own LRU-evicted partition
+def load_companies():
+    return get_result_cache().get(("companies",), get_backend().list_companies, max_age=COMPANIES_MAX_AGE)
+
+# Snapshots persist under SNAPSHOT_DIR so restarts and sibling worker processes
+# start from local data
+@st.cache_resource
+def get_company_cache():
+    return CompanyCache(get_backend(), snapshot_dir=SNAPSHOT_DIR)
+
+def company_backend(version):
+    """The company's backend with its results shared through the result cache until ``version`` moves."""
+    return CachingBackend(get_company_cache().get(version.company).backend, get_result_cache(), version)
+
+# Data versioning - table snapshots are refreshed with LAST_UPDATED deltas, and
+# every data cache below is keyed on their version instead of expiring on a TTL
+def data_version(company):
+    """Return the selected company's data version.
+
+    Snapshots found on disk are served immediately and revalidated against
+    the warehouse in the background; only a missing snapshot blocks.
+    """
+    cache = get_company_cache()
+    with telemetry.stage("refresh"):
+        version = cache.get(company).refresh(background=True)
+    cache.evict()
+    prefetch_quality_report(version)
+    return version
+
+# Concurrent loading - a page submits the independent loaders it renders to a
+# shared pool and waits only on those, instead of running them back to back
+LOADER_THREADS = 8
+
+@st.cache_resource
+def get_loader_pool():
+    return ThreadPoolExecutor(max_workers=LOADER_THREADS, thread_name_prefix="loader")
+
+def load_concurrently(*calls):
+    """Run ``(loader, *args)`` calls in parallel and return their results in order."""
+    ctx = get_script_run_ctx()
+    
+    def run(loader, *args):
+        # Cached loaders need the session's script context on the worker thread
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader(*args)
+    
+    with telemetry.stage("load", loaders=len(calls)):
+        # Each call gets its own copy of the context so its spans join the page run
+        futures = [get_loader_pool().submit(contextvars.copy_context().run, run, *call) for call in calls]
+        return [future.result() for future in futures]
+
+# Bounds the number of superseded data versions kept around
+CACHE_ENTRIES = 512
+
+# Data loading - USE st.cache_data for data. Each loader asks Snowflake only
+# for what one page renders; filters arrive as tuples so they hash cheaply.
+@cached_loader(max_entries=CACHE_ENTRIES, persist="disk")
+def load_aggregates(version):
+    # Computed once per data version and shared by every chart page; persisted
+    # so a restart serving an on-disk snapshot paints charts without a query
+    return AggregateStore.build(company_backend(version))
+
+# Data quality - every check runs in one vectorized pass per data version. The
+# report is built on a background thread as soon as a new version is seen and kept
+# in the result cache, so the Analytics page reads a finished report
+def _quality_report(version):
+    backend = get_company_cache().get(version.company).backend
+    return ("quality", version), lambda: quality.build_report(backend)
+
+def prefetch_quality_report(version):
+    get_result_cache().prefetch(*_quality_report(version))
+
+def load_quality_report(version):
+    # Waits on the background build if it is still running rather than starting another
+    return get_result_cache().get(*_quality_report(version))
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def load_recent_updates(version, limit=5):
+    return queries.recent_updates(company_backend(version), limit=limit)
+
+# Filters - multiselect options and browse counts come from per-value row bitmaps
+# built once per snapshot version; selections are memoized by filter tuple
+def filter_options(version, table, column):
+    return get_company_cache().get(version.company).filter_index(table).values[column]
+
+def filter_count(version, table, filters):
+    return get_company_cache().get(version.company).filter_index(table).count(filters)
+
+# Long text - DESCRIPTION and KEY_FEATURES are already held in each snapshot's text
+# store, so card loaders fetch only the short columns and look the text up by id
+def with_text(version, table, columns, fetch):
+    """``fetch(columns)``, with the snapshot's text columns taken from its text store instead."""
+    snapshot = get_company_cache().get(version.company).snapshots[table]
+    text_columns = [column for column in columns if column in snapshot.text_columns]
+    if not text_columns or snapshot.state is None:
+        return fetch(columns)
+    id_column = snapshot.spec.id_column
+    frame = fetch(tuple(dict.fromkeys((id_column, *(column for column in columns if column not in text_columns)))))
+    ids = frame[id_column].to_numpy(dtype=np.int64)
+    text = snapshot.text_by_id(ids, text_columns)
+    text = text.set_index(text[id_column].to_numpy(dtype=np.int64))[text_columns].reindex(ids)
+    for column in text_columns:
+        frame[column] = text[column].astype(object).where(text[column].notna(), None).to_numpy()
+    return frame[list(columns)]
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def load_subsidiaries(version, segments=None, columns=queries.SUBSIDIARY_CARD_COLUMNS, limit=None, offset=0):
+    return with_text(version, queries.SUBSIDIARIES.name, columns, lambda columns: queries.select_rows(
+        company_backend(version), queries.SUBSIDIARIES, columns,
+        filters={"BUSINESS_SEGMENT": segments}, limit=limit, offset=offset
+    ))
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def load_products(version, segments=None, categories=None, columns=queries.PRODUCT_CARD_COLUMNS, limit=None, offset=0):
+    return with_text(version, queries.PRODUCTS.name, columns, lambda columns: queries.select_rows(
+        company_backend(version), queries.PRODUCTS, columns,
+        filters={"BUSINESS_SEGMENT": segments, "PRODUCT_SERVICE_CATEGORY": categories},
+        limit=limit, offset=offset
+    ))
+
+# Search - a token index per table, rebuilt from the snapshot only when its version moves
+def search_scope(version, table, filters):
+    """Return the table's search index and the mask for ``filters`` (None if unfiltered)."""
+    return get_company_cache().get(version.company).search_scope(table, filters)
+
+# Figures - memoized per (page, filter state, data version) as trimmed figure JSON,
+# so reruns that only touch the sidebar don't rebuild any chart
+@cached_loader(max_entries=CACHE_ENTRIES)
+def load_figure(version, page, chart, filter_state=None):
+    # Imported here so pages without charts never load Plotly
+    from dashboard import figures
+
+    return figures.build(page, chart, load_aggregates(version), filter_state)
+
+def product_index(version):
+    """Subsidiary id -> products lookups for ``version``, built once per products snapshot."""
+    return get_company_cache().get(version.company).product_index()
+
+# Change history - a diff reads only the change log entries of rows changed in
+# the range. The log is filled by triggers or a task independently of the table
+# snapshots, so diffs are cached on the log's own watermark, not the data version
+def load_changes(version, table, start, end):
+    """The diff of ``table`` between ``start`` and ``end``; None when the company's change log is not installed."""
+    backend = get_company_cache().get(version.company).backend
+    spec = history.SPECS[table]
+    if not history.installed(backend, spec):
+        return None
+    return _load_diff(version.company, table, start, end, history.log_watermark(backend, spec))
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def _load_diff(company, table, start, end, watermark):
+    with telemetry.stage("diff", table=table):
+        return history.diff(get_company_cache().get(company).backend, history.SPECS[table], start, end)
+
+# Similar products - nearest neighbours in a vector index of product text, built
+# once per products snapshot; a lookup is one matrix-vector product
+SIMILAR_PRODUCTS = 5
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def similar_products(version, product_id, limit=SIMILAR_PRODUCTS):
+    """(product id, score) pairs most like ``product_id``, best first."""
+    with telemetry.stage("similar", table=queries.PRODUCTS.name):
+        return get_company_cache().get(version.company).similarity_index().similar(product_id, limit)
+
+@cached_loader(max_entries=CACHE_ENTRIES)
+def load_rows_by_id(version, table, ids, columns):
+    return with_text(
+        version, table, columns,
+        lambda columns: queries.rows_by_id(company_backend(version), queries.TABLES[table], columns, ids)
+    )
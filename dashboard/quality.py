@@ -0,0 +1,172 @@
+"""Data-quality checks over both tables, run once per data version.
+
+``build_report`` reads the columns the checks need with one query per table
+(long text arrives as its length only), evaluates every check as a
+vectorized expression over the whole table and returns a ``QualityReport``
+with failure counts and a few example rows per check. The dashboard starts
+building the report in the background as soon as it sees a new data
+version and keeps it in the shared result cache, so the Analytics page only
+reads it.
+
+Adding a check is one ``Check`` entry: a function from the table's frame
+(and the other tables' frames, for cross-table checks) to a boolean mask of
+failing rows.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard import queries, telemetry
+
+# http(s) scheme, a dotted host without spaces, then an optional path, query or fragment
+URL_PATTERN = r"^https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?$"
+
+MIN_DESCRIPTION_LENGTH = 50
+
+# Failing rows kept per check for the Analytics page
+EXAMPLE_ROWS = 20
+
+# Per table: name shown with failing rows, columns read, columns read as their length only
+TableInputs = namedtuple("TableInputs", ["label_column", "columns", "length_columns"])
+
+TABLE_INPUTS = {
+    queries.SUBSIDIARIES.name: TableInputs("COMPANY_NAME", ("COMPANY_NAME", "WEBSITE_URL"), ("DESCRIPTION",)),
+    queries.PRODUCTS.name: TableInputs(
+        "PRODUCT_SERVICE_NAME", ("SUBSIDIARY_NAME", "PRODUCT_SERVICE_NAME", "PRODUCT_URL"), ("DESCRIPTION",)
+    ),
+}
+
+# failures(frame, frames) -> boolean mask of ``frame``'s failing rows; column is shown with them
+Check = namedtuple("Check", ["table", "name", "description", "column", "failures"])
+
+
+def _present(values):
+    return values.notna() & values.astype(str).str.strip().ne("")
+
+
+def _normalised(values):
+    return values.astype(str).str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def invalid_url(column):
+    def failures(frame, frames):
+        values = frame[column]
+        return _present(values) & ~values.astype(str).str.match(URL_PATTERN)
+    return failures
+
+
+def short_text(column, minimum=MIN_DESCRIPTION_LENGTH):
+    # Missing text is left to the completeness metrics
+    def failures(frame, frames):
+        lengths = frame[f"{column}_LENGTH"]
+        return lengths.notna() & (lengths < minimum)
+    return failures
+
+
+def duplicated(*columns):
+    """Rows sharing all of ``columns`` with another row, ignoring case and spacing."""
+    def failures(frame, frames):
+        present = np.logical_and.reduce([_present(frame[column]) for column in columns])
+        keys = pd.DataFrame({column: _normalised(frame[column]) for column in columns})
+        return present & keys.duplicated(keep=False)
+    return failures
+
+
+def orphaned(column, parent_table, parent_column):
+    """Rows whose ``column`` matches no ``parent_column`` value of ``parent_table``."""
+    def failures(frame, frames):
+        values = frame[column]
+        return _present(values) & ~values.isin(frames[parent_table][parent_column])
+    return failures
+
+
+CHECKS = (
+    Check(
+        queries.SUBSIDIARIES.name, "Invalid website URL",
+        "Website URL present but not an http(s) address", "WEBSITE_URL", invalid_url("WEBSITE_URL"),
+    ),
+    Check(
+        queries.SUBSIDIARIES.name, "Short description",
+        f"Description under {MIN_DESCRIPTION_LENGTH} characters", "DESCRIPTION_LENGTH", short_text("DESCRIPTION"),
+    ),
+    Check(
+        queries.SUBSIDIARIES.name, "Duplicate company name",
+        "Company name shared with another subsidiary", "COMPANY_NAME", duplicated("COMPANY_NAME"),
+    ),
+    Check(
+        queries.PRODUCTS.name, "Invalid product URL",
+        "Product URL present but not an http(s) address", "PRODUCT_URL", invalid_url("PRODUCT_URL"),
+    ),
+    Check(
+        queries.PRODUCTS.name, "Short description",
+        f"Description under {MIN_DESCRIPTION_LENGTH} characters", "DESCRIPTION_LENGTH", short_text("DESCRIPTION"),
+    ),
+    Check(
+        queries.PRODUCTS.name, "Duplicate product name",
+        "Product name repeated within one subsidiary", "PRODUCT_SERVICE_NAME",
+        duplicated("SUBSIDIARY_NAME", "PRODUCT_SERVICE_NAME"),
+    ),
+    Check(
+        queries.PRODUCTS.name, "Orphaned subsidiary name",
+        "Subsidiary name that matches no subsidiary's company name", "SUBSIDIARY_NAME",
+        orphaned("SUBSIDIARY_NAME", queries.SUBSIDIARIES.name, "COMPANY_NAME"),
+    ),
+)
+
+
+class QualityReport:
+    def __init__(self, summary, examples, seconds):
+        # TABLE, CHECK, DESCRIPTION, ROWS, FAILED, PASS_RATE (percent), one row per check
+        self.summary = summary
+        # (table, check name) -> up to EXAMPLE_ROWS failing rows: ID, NAME, VALUE
+        self.examples = examples
+        self.seconds = seconds
+
+    def failed_checks(self):
+        """(table, check name) of checks with failures, most failures first."""
+        failed = self.summary[self.summary["FAILED"] > 0].sort_values("FAILED", ascending=False, kind="stable")
+        return list(zip(failed["TABLE"], failed["CHECK"]))
+
+
+def run_checks(frames, checks=CHECKS):
+    """A ``QualityReport`` for ``checks`` over ``frames`` (table name -> frame from ``read_inputs``)."""
+    start = time.perf_counter()
+    rows, examples = [], {}
+    for check in checks:
+        frame = frames[check.table]
+        failed = np.asarray(check.failures(frame, frames), dtype=bool)
+        count = int(failed.sum())
+        rows.append({
+            "TABLE": check.table,
+            "CHECK": check.name,
+            "DESCRIPTION": check.description,
+            "ROWS": len(frame),
+            "FAILED": count,
+            "PASS_RATE": (1 - count / len(frame)) * 100 if len(frame) else 100.0,
+        })
+        if count:
+            sample = frame[failed].head(EXAMPLE_ROWS)
+            examples[check.table, check.name] = pd.DataFrame({
+                "ID": sample[queries.TABLES[check.table].id_column].to_numpy(),
+                "NAME": sample[TABLE_INPUTS[check.table].label_column].to_numpy(),
+                "VALUE": sample[check.column].to_numpy(),
+            })
+    return QualityReport(pd.DataFrame(rows), examples, time.perf_counter() - start)
+
+
+def read_inputs(backend):
+    """The columns every check needs, one query per table."""
+    frames = {}
+    for table, inputs in TABLE_INPUTS.items():
+        frame = queries.quality_inputs(backend, queries.TABLES[table], inputs.columns, inputs.length_columns)
+        for column in inputs.length_columns:
+            frame[f"{column}_LENGTH"] = frame[f"{column}_LENGTH"].astype("Int64")
+        frames[table] = frame
+    return frames
+
+
+def build_report(backend):
+    with telemetry.stage("quality"):
+        return run_checks(read_inputs(backend))
@@ -0,0 +1,228 @@
+"""Parameterized queries used by the dashboard pages.
+
+Each page asks only for the columns, filters and aggregates it renders, so
+filtering, searching and grouping happen in the warehouse instead of on a
+``SELECT *`` copy of both tables held in pandas.
+
+Every function takes a backend from ``dashboard.backends`` as its first
+argument. Identifiers come from the table specs below, never from user
+input; user-supplied values are always passed as bind parameters.
+"""
+import re
+from collections import namedtuple
+
+TableSpec = namedtuple("TableSpec", ["name", "id_column", "order_by", "search_columns"])
+
+SUBSIDIARIES = TableSpec(
+    name="Subsidiaries",
+    id_column="SUBSIDIARY_ID",
+    order_by=("BUSINESS_SEGMENT", "COMPANY_NAME"),
+    search_columns=("COMPANY_NAME", "DESCRIPTION"),
+)
+
+PRODUCTS = TableSpec(
+    name="Subsidiary_Products_Services",
+    id_column="PRODUCT_SERVICE_ID",
+    order_by=("BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY", "PRODUCT_SERVICE_NAME"),
+    search_columns=("PRODUCT_SERVICE_NAME", "DESCRIPTION", "KEY_FEATURES"),
+)
+
+TABLES = {spec.name: spec for spec in (SUBSIDIARIES, PRODUCTS)}
+
+SUBSIDIARY_CARD_COLUMNS = (
+    "SUBSIDIARY_ID", "COMPANY_NAME", "BUSINESS_SEGMENT", "DESCRIPTION",
+    "KEY_PRODUCTS_SERVICES", "MARKET_POSITION", "WEBSITE_URL",
+    "CREATED_DATE", "LAST_UPDATED",
+)
+
+PRODUCT_CARD_COLUMNS = (
+    "PRODUCT_SERVICE_ID", "SUBSIDIARY_NAME", "PRODUCT_SERVICE_CATEGORY",
+    "PRODUCT_SERVICE_NAME", "DESCRIPTION", "TARGET_MARKET", "KEY_FEATURES",
+    "PRODUCT_URL",
+)
+
+# Fields checked on the Analytics page: label -> (column, blank string counts as missing)
+SUBSIDIARY_COMPLETENESS_FIELDS = {
+    "Company Name": ("COMPANY_NAME", False),
+    "Description": ("DESCRIPTION", False),
+    "Market Position": ("MARKET_POSITION", False),
+    "Website URL": ("WEBSITE_URL", True),
+}
+
+PRODUCT_COMPLETENESS_FIELDS = {
+    "Product Name": ("PRODUCT_SERVICE_NAME", False),
+    "Description": ("DESCRIPTION", False),
+    "Target Market": ("TARGET_MARKET", False),
+    "Product URL": ("PRODUCT_URL", True),
+}
+
+_IDENTIFIER = re.compile(r"^[A-Z_][A-Z0-9_]*$")
+
+
+def _column(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid column name: {name!r}")
+    return name
+
+
+def _column_list(columns):
+    return ", ".join(_column(column) for column in columns)
+
+
+def _present(column):
+    return f"({column} IS NOT NULL AND {column} <> '')"
+
+
+def _in_clause(column, values, prefix, params):
+    names = []
+    for i, value in enumerate(values):
+        key = f"{prefix}_{i}"
+        params[key] = value
+        names.append(f"%({key})s")
+    if not names:
+        return "1 = 0"
+    return f"{_column(column)} IN ({', '.join(names)})"
+
+
+def _where(filters, params):
+    """Build a WHERE clause from ``{column: values}`` filters.
+
+    A filter value of ``None`` means "no filter"; an empty collection matches
+    nothing, the same as ``isin([])`` did on the old in-memory frames.
+    """
+    clauses = []
+    for i, (column, values) in enumerate((filters or {}).items()):
+        if values is not None:
+            clauses.append(_in_clause(column, list(values), f"f{i}", params))
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def select_rows(backend, spec, columns, filters=None, limit=None, offset=0):
+    """Fetch rows in display order, optionally one page at a time.
+
+    The id column breaks ties in the ORDER BY so LIMIT/OFFSET pages are stable.
+    """
+    params = {}
+    where = _where(filters, params)
+    order_by = _column_list(spec.order_by + (spec.id_column,))
+    sql = f"""
+    SELECT {_column_list(columns)}
+    FROM {backend.table(spec.name)}
+    {where}
+    ORDER BY {order_by}
+    """
+    if limit is not None:
+        params["limit"] = int(limit)
+        params["offset"] = int(offset)
+        sql += " LIMIT %(limit)s OFFSET %(offset)s"
+    return backend.query(sql, params)
+
+
+def select_ids(backend, spec, filters=None):
+    """Ids of the rows matching ``filters``, without fetching any other column."""
+    params = {}
+    where = _where(filters, params)
+    sql = f"SELECT {spec.id_column} FROM {backend.table(spec.name)} {where}"
+    return backend.query(sql, params)[spec.id_column].to_numpy()
+
+
+def rows_by_id(backend, spec, columns, ids):
+    """Fetch specific rows, returned in the order of ``ids``."""
+    ids = [int(row_id) for row_id in ids]
+    if spec.id_column not in columns:
+        columns = (spec.id_column,) + tuple(columns)
+    frame = select_rows(backend, spec, columns, filters={spec.id_column: ids})
+    return frame.set_index(spec.id_column).reindex(ids).dropna(how="all").reset_index()
+
+
+def changed_rows(backend, spec, columns, since):
+    """Rows touched at or after ``since``.
+
+    ``>=`` rather than ``>`` so rows written in the same instant as the last
+    refresh are not missed; callers upsert by id, so re-reading them is harmless.
+    """
+    sql = f"""
+    SELECT {_column_list(columns)}
+    FROM {backend.table(spec.name)}
+    WHERE LAST_UPDATED >= %(since)s
+    ORDER BY {spec.id_column}
+    """
+    return backend.query(sql, {"since": since})
+
+
+def id_fingerprint(backend, spec):
+    """Row count and id sum, used to detect deletions without reading every id."""
+    sql = f"""
+    SELECT COUNT(*) AS ROW_COUNT, COALESCE(SUM({spec.id_column}), 0) AS ID_SUM
+    FROM {backend.table(spec.name)}
+    """
+    row = backend.query(sql).iloc[0]
+    return int(row["ROW_COUNT"]), int(row["ID_SUM"])
+
+
+def segment_category_counts(backend):
+    """Product counts and URL coverage per (segment, category) pair."""
+    sql = f"""
+    SELECT BUSINESS_SEGMENT,
+           PRODUCT_SERVICE_CATEGORY,
+           COUNT(*) AS PRODUCT_COUNT,
+           COUNT(PRODUCT_SERVICE_NAME) AS NAMED_PRODUCT_COUNT,
+           SUM(CASE WHEN {_present('PRODUCT_URL')} THEN 1 ELSE 0 END) AS HAS_PRODUCT_URL
+    FROM {backend.table(PRODUCTS.name)}
+    GROUP BY BUSINESS_SEGMENT, PRODUCT_SERVICE_CATEGORY
+    ORDER BY BUSINESS_SEGMENT, PRODUCT_SERVICE_CATEGORY
+    """
+    return backend.query(sql)
+
+
+def segment_subsidiary_counts(backend):
+    """Subsidiary counts and website coverage per segment."""
+    sql = f"""
+    SELECT BUSINESS_SEGMENT,
+           COUNT(*) AS SUBSIDIARY_COUNT,
+           SUM(CASE WHEN {_present('WEBSITE_URL')} THEN 1 ELSE 0 END) AS HAS_WEBSITE
+    FROM {backend.table(SUBSIDIARIES.name)}
+    GROUP BY BUSINESS_SEGMENT
+    ORDER BY BUSINESS_SEGMENT
+    """
+    return backend.query(sql)
+
+
+def recent_updates(backend, limit=5):
+    sql = f"""
+    SELECT COMPANY_NAME, BUSINESS_SEGMENT, LAST_UPDATED
+    FROM {backend.table(SUBSIDIARIES.name)}
+    ORDER BY LAST_UPDATED DESC, SUBSIDIARY_ID
+    LIMIT %(limit)s
+    """
+    return backend.query(sql, {"limit": int(limit)})
+
+
+def quality_inputs(backend, spec, columns, length_columns=()):
+    """Every row's ``columns``, plus ``<column>_LENGTH`` for each of ``length_columns`` instead of its text."""
+    lengths = [f"LENGTH({_column(column)}) AS {column}_LENGTH" for column in length_columns]
+    sql = f"""
+    SELECT {", ".join([_column(spec.id_column), *map(_column, columns), *lengths])}
+    FROM {backend.table(spec.name)}
+    ORDER BY {spec.id_column}
+    """
+    return backend.query(sql)
+
+
+def completeness(backend, spec, fields):
+    """Percentage of rows with each field populated, in a single scan."""
+    expressions = []
+    for i, (column, blank_is_missing) in enumerate(fields.values()):
+        column = _column(column)
+        condition = _present(column) if blank_is_missing else f"{column} IS NOT NULL"
+        expressions.append(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS FIELD_{i}")
+    sql = f"""
+    SELECT COUNT(*) AS ROW_COUNT, {', '.join(expressions)}
+    FROM {backend.table(spec.name)}
+    """
+    row = backend.query(sql).iloc[0]
+    total = int(row["ROW_COUNT"])
+    return {
+        label: (float(row[f"FIELD_{i}"]) / total * 100) if total else 0.0
+        for i, label in enumerate(fields)
+    }
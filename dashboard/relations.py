@@ -0,0 +1,43 @@
+"""Subsidiary -> products lookups over the products snapshot.
+
+``Subsidiary_Products_Services.subsidiary_id`` references
+``Subsidiaries.subsidiary_id``. ``ProductIndex`` groups the product snapshot
+by that key once per data version, so a subsidiary's product count and
+product list are a dict lookup and a slice instead of comparing
+``SUBSIDIARY_NAME`` strings across both tables.
+"""
+import numpy as np
+import pandas as pd
+
+
+class ProductIndex:
+    def __init__(self, ranges, product_ids, names):
+        # subsidiary id -> (start, stop) into product_ids / names
+        self.ranges = ranges
+        self.product_ids = product_ids
+        self.names = names
+
+    @classmethod
+    def from_frame(cls, frame, id_column="PRODUCT_SERVICE_ID", name_column="PRODUCT_SERVICE_NAME"):
+        """Group ``frame`` by SUBSIDIARY_ID; products without a subsidiary are left out."""
+        subsidiary_ids = pd.to_numeric(frame["SUBSIDIARY_ID"]).to_numpy(dtype=np.float64, na_value=np.nan)
+        linked = np.flatnonzero(~np.isnan(subsidiary_ids))
+        order = linked[np.argsort(subsidiary_ids[linked], kind="stable")]
+        keys = subsidiary_ids[order].astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+        stops = np.r_[starts[1:], len(keys)]
+        ranges = {int(keys[start]): (int(start), int(stop)) for start, stop in zip(starts, stops)}
+        return cls(
+            ranges,
+            frame[id_column].to_numpy(dtype=np.int64)[order],
+            frame[name_column].take(order).reset_index(drop=True),
+        )
+
+    def count(self, subsidiary_id):
+        start, stop = self.ranges.get(int(subsidiary_id), (0, 0))
+        return stop - start
+
+    def products(self, subsidiary_id):
+        """Product names for ``subsidiary_id`` in product id order."""
+        start, stop = self.ranges.get(int(subsidiary_id), (0, 0))
+        return self.names.iloc[start:stop].tolist()
@@ -0,0 +1,298 @@
+"""Process-wide query result cache shared by every session.
+
+``ResultCache.get(key, load)`` returns the cached value for ``key`` or runs
+``load`` once, however many sessions ask at the same moment: concurrent
+callers of a missing key wait on the one in-flight load instead of each
+sending the same query. Entries older than ``max_age`` are served stale
+while a single background load replaces them.
+
+Values live in a store. ``MemoryStore`` (the default) keeps them in this
+process and evicts least-recently-used entries beyond a byte budget.
+``RedisStore`` keeps pickled values in a Redis-compatible server so that
+every worker process shares them; a lock key per entry extends coalescing
+across processes, and the server's ``maxmemory-policy allkeys-lru`` takes
+the place of the byte budget. ``LocalRedis`` is an in-process stand-in for
+the server, for development without one.
+
+``CachingBackend`` answers a backend's queries from the cache, keyed on the
+SQL, its parameters and a scope (the data version), so one warehouse query
+serves every session until the data changes.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from dashboard import telemetry
+
+MAX_BYTES = 256 << 20
+
+# How long a caller waits for another process's load before running it itself
+LOAD_TIMEOUT = 120
+POLL_INTERVAL = 0.05
+
+# Redis entries expire on their own after a day without a refresh
+REDIS_TTL = 86400
+
+CacheEntry = namedtuple("CacheEntry", ["value", "stored_at"])
+
+
+def value_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return telemetry.frame_bytes(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class MemoryStore:
+    """Entries held in this process, least recently used evicted beyond ``max_bytes``."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def set(self, key, entry):
+        size = value_bytes(entry.value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            # A value larger than the whole budget would only flush everything else
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (entry, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def lock(self, key, timeout):
+        # One process: ResultCache already coalesces loads in memory
+        return True
+
+    def unlock(self, key):
+        pass
+
+
+class RedisStore:
+    """Pickled entries in a Redis-compatible server, shared by every process using it.
+
+    Only point this at a server the dashboard trusts: values are unpickled.
+    """
+
+    def __init__(self, client, prefix="dashboard:results:", ttl=REDIS_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, key):
+        return self.prefix + hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def __contains__(self, key):
+        # EXISTS, so checking for a large entry does not transfer and unpickle it
+        return bool(self.client.exists(self._key(key)))
+
+    def get(self, key):
+        data = self.client.get(self._key(key))
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key, entry):
+        self.client.set(self._key(key), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), ex=self.ttl)
+
+    def lock(self, key, timeout):
+        return bool(self.client.set(self._key(key) + ":lock", b"1", nx=True, ex=max(1, int(timeout))))
+
+    def unlock(self, key):
+        self.client.delete(self._key(key) + ":lock")
+
+
+class LocalRedis:
+    """The subset of the Redis client API that ``RedisStore`` uses, kept in memory."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        value, expires = self._data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def exists(self, *keys):
+        with self._lock:
+            return sum(self._live(key) is not None for key in keys)
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (value, None if ex is None else time.monotonic() + ex)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+def redis_store(url):
+    """A ``RedisStore`` for ``url``; ``local://`` uses the in-process ``LocalRedis``."""
+    if url.startswith("local://"):
+        return RedisStore(LocalRedis())
+    import redis
+
+    return RedisStore(redis.Redis.from_url(url))
+
+
+class ResultCache:
+    def __init__(self, store=None, load_timeout=LOAD_TIMEOUT):
+        self.store = MemoryStore() if store is None else store
+        self.load_timeout = load_timeout
+        self.stats = Counter()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, load, max_age=None):
+        """The value cached for ``key``, loading it with ``load()`` when missing.
+
+        With ``max_age`` (seconds), an older entry is returned as-is while a
+        background load replaces it.
+        """
+        entry = self.store.get(key)
+        if entry is None:
+            return self._load(key, load, None, wait=True)
+        if max_age is not None and time.time() - entry.stored_at >= max_age:
+            self._count("stale")
+            self._load(key, load, entry.stored_at, wait=False)
+        else:
+            self._count("hits")
+        return entry.value
+
+    def prefetch(self, key, load):
+        """Start loading ``key`` in the background unless it is cached or already loading."""
+        if key not in self.store:
+            self._load(key, load, None, wait=False)
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _load(self, key, load, stored_at, wait):
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None and wait:
+                # A load may have finished between the caller's lookup and here
+                entry = self.store.get(key)
+                if entry is not None:
+                    self.stats["hits"] += 1
+                    return entry.value
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            if wait:
+                self.stats["misses" if leader else "coalesced"] += 1
+        if not leader:
+            return future.result() if wait else None
+        if wait:
+            return self._run(key, load, stored_at, future)
+
+        def revalidate():
+            try:
+                self._run(key, load, stored_at, future)
+            except Exception:
+                pass  # the stale entry keeps being served; the next request retries
+
+        threading.Thread(target=revalidate, name="result-cache", daemon=True).start()
+        return None
+
+    def _run(self, key, load, stored_at, future):
+        try:
+            value = self._load_shared(key, load, stored_at)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _load_shared(self, key, load, stored_at):
+        """Run ``load`` unless another process holding the store's lock is already doing so."""
+        if not self.store.lock(key, self.load_timeout):
+            deadline = time.monotonic() + self.load_timeout
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                entry = self.store.get(key)
+                if entry is not None and (stored_at is None or entry.stored_at > stored_at):
+                    self._count("shared")
+                    return entry.value
+            # The other process gave up or died; load without the lock
+            return self._store(key, load())
+        try:
+            return self._store(key, load())
+        finally:
+            self.store.unlock(key)
+
+    def _store(self, key, value):
+        self.store.set(key, CacheEntry(value, time.time()))
+        return value
+
+    def summary(self):
+        """Entry count, bytes held (in-process stores only) and outcome counts."""
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            "entries": len(self.store) if hasattr(self.store, "__len__") else None,
+            "bytes": getattr(self.store, "nbytes", None),
+            **{outcome: stats.get(outcome, 0) for outcome in ("hits", "misses", "coalesced", "stale", "shared")},
+        }
+
+
+class CachingBackend:
+    """``backend`` with ``query`` answered from ``cache``.
+
+    ``scope`` is part of every key; pass the data version so results are
+    reused only while the data they were read from is current. Everything
+    else (``table``, ``execute``, ...) goes straight to ``backend``.
+    """
+
+    def __init__(self, backend, cache, scope):
+        self.backend = backend
+        self.cache = cache
+        self.scope = scope
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def query(self, sql, params=None):
+        key = ("query", self.scope, " ".join(sql.split()), tuple(sorted((params or {}).items())))
+        return self.cache.get(key, lambda: self.backend.query(sql, params))
@@ -0,0 +1,171 @@
+"""In-memory inverted index for the directory search boxes.
+
+The index is built once per data watermark from the id and text columns of
+a table and answers searches without touching the text again:
+
+* every query term is a prefix match ("onco" finds "oncology"),
+* multi-term queries are ANDed,
+* results are ranked by BM25, with the first (name) field weighted higher.
+
+Postings are stored CSR-style over the sorted vocabulary, so all tokens
+sharing a prefix occupy one contiguous slice of the posting arrays.
+"""
+import re
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+
+NAME_FIELD_WEIGHT = 3.0
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rows tokenized at a time while building, bounding the token strings held in memory
+CHUNK_SIZE = 10_000
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def field_weights(columns):
+    """Weight the first search column (the name) above the descriptive ones."""
+    return {column: (NAME_FIELD_WEIGHT if i == 0 else 1.0) for i, column in enumerate(columns)}
+
+
+def _weighted_term_counts(frame, weights, chunk_size):
+    """(doc, token code, field-weighted term frequency) per distinct token of each row, and the tokens.
+
+    Rows are tokenized a chunk at a time so only one chunk's token strings
+    are alive at once; the rest of the build works on integer codes.
+    """
+    vocabulary = {}
+    docs, codes, counts = [], [], []
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        doc_parts, token_parts, weight_parts = [], [], []
+        for column, weight in weights.items():
+            tokens = chunk[column].fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN)
+            lengths = tokens.str.len().to_numpy(dtype=np.int64)
+            doc_parts.append(np.repeat(np.arange(start, start + len(chunk)), lengths))
+            token_parts.append(np.fromiter(chain.from_iterable(tokens), dtype=object, count=lengths.sum()))
+            weight_parts.append(np.full(lengths.sum(), weight, dtype=np.float64))
+        local, uniques = pd.factorize(np.concatenate(token_parts))
+        if not len(uniques):
+            continue
+        pairs, inverse = np.unique(np.concatenate(doc_parts) * len(uniques) + local, return_inverse=True)
+        tf = np.bincount(inverse, weights=np.concatenate(weight_parts), minlength=len(pairs))
+        chunk_docs, local = np.divmod(pairs, len(uniques))
+        mapping = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for token in uniques), dtype=np.int64, count=len(uniques)
+        )
+        docs.append(chunk_docs.astype(np.int32))
+        codes.append(mapping[local].astype(np.int32))
+        counts.append(tf.astype(np.float32))
+    if not docs:
+        empty = np.array([], dtype=np.int32)
+        return empty, empty, empty.astype(np.float32), np.array([], dtype=object)
+    tokens = np.fromiter(vocabulary, dtype=object, count=len(vocabulary))
+    return np.concatenate(docs), np.concatenate(codes), np.concatenate(counts), tokens
+
+
+class SearchIndex:
+    def __init__(self, ids, vocabulary, offsets, postings, scores):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.scores = scores
+        self._match_term = lru_cache(maxsize=1024)(self._match_term_uncached)
+        self.nbytes = (
+            ids.nbytes + offsets.nbytes + postings.nbytes + scores.nbytes
+            + sum(map(sys.getsizeof, vocabulary))
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_frame(cls, frame, id_column, weights, chunk_size=CHUNK_SIZE):
+        """Build an index from ``frame``; ``weights`` maps text column -> field weight."""
+        ids = frame[id_column].to_numpy(dtype=np.int64)
+        n_docs = len(ids)
+        docs, codes, tf, tokens = _weighted_term_counts(frame, weights, chunk_size)
+        if not len(docs):
+            return cls(ids, [], np.zeros(1, dtype=np.int64), docs.astype(np.int32), docs.astype(np.float32))
+
+        # Renumber tokens in sorted order so every prefix is one contiguous slice
+        order = np.argsort(tokens, kind="stable")
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order))
+        vocabulary = tokens[order].tolist()
+        token_codes = rank[codes]
+        order = np.lexsort((docs, token_codes))
+        token_codes, docs, tf = token_codes[order], docs[order], tf[order]
+
+        doc_lengths = np.bincount(docs, weights=tf, minlength=n_docs)
+        average_length = doc_lengths.mean() or 1.0
+        document_frequency = np.bincount(token_codes, minlength=len(vocabulary))
+        idf = np.log1p((n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[docs] / average_length)
+        scores = idf[token_codes] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=offsets[1:])
+        return cls(ids, vocabulary, offsets, docs.astype(np.int32), scores.astype(np.float32))
+
+    def _match_term_uncached(self, prefix):
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + "\uffff", lo)
+        docs = self.postings[self.offsets[lo]:self.offsets[hi]]
+        scores = self.scores[self.offsets[lo]:self.offsets[hi]]
+        if hi - lo > 1:
+            # Several tokens share the prefix; merge them so each doc appears once
+            dense = np.bincount(docs, weights=scores, minlength=len(self.ids))
+            docs = np.flatnonzero(dense).astype(np.int32)
+            scores = dense[docs].astype(np.float32)
+        return docs, scores
+
+    def _matches(self, query, mask):
+        matches = [self._match_term(term) for term in set(tokenize(query))]
+        if not matches:
+            return self.postings[:0], self.scores[:0]
+        matches.sort(key=lambda match: len(match[0]))
+        docs, scores = matches[0]
+        for term_docs, term_scores in matches[1:]:
+            if not len(docs):
+                break
+            # Both sides are sorted; probe the larger with the smaller
+            positions = np.searchsorted(term_docs, docs).clip(max=len(term_docs) - 1)
+            found = term_docs[positions] == docs
+            docs = docs[found]
+            scores = scores[found] + term_scores[positions[found]]
+        if mask is not None:
+            keep = mask[docs]
+            docs, scores = docs[keep], scores[keep]
+        return docs, scores
+
+    def count(self, query, mask=None):
+        """Number of rows matching ``query`` (see ``search`` for ``mask``)."""
+        return len(self._matches(query, mask)[0])
+
+    def search(self, query, mask=None, limit=None):
+        """Return ids matching ``query``, best match first.
+
+        ``mask`` is an optional boolean array aligned with ``self.ids`` that
+        restricts the candidates (e.g. the active segment filters); ``limit``
+        bounds how many ranked ids are returned. An empty query matches nothing.
+        """
+        docs, scores = self._matches(query, mask)
+        if limit is not None and limit < len(docs):
+            top = np.argpartition(-scores, limit - 1)[:limit] if limit else docs[:0]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return self.ids[docs[order]]
@@ -0,0 +1,184 @@
+"""Vector index for "similar products" lookups.
+
+Each product's name, description and key features are turned into one
+L2-normalised float32 vector when the products snapshot changes, so a
+lookup is a single matrix-vector product plus a partial sort and never
+reads the text again.
+
+Vectors come from a local sentence-embedding model when
+``DASHBOARD_EMBEDDING_MODEL`` names one and ``sentence-transformers`` is
+installed. Otherwise they are built from TF-IDF, which needs nothing beyond
+numpy and works offline: the sparse TF-IDF vectors are folded into
+``DIMENSIONS`` dense columns by signed feature hashing (a random projection
+that roughly preserves cosine similarity), the dense matrix picks
+``RERANK`` candidates and the exact TF-IDF cosine orders them.
+"""
+import os
+import zlib
+from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from dashboard.search_index import TOKEN_PATTERN
+
+EMBEDDING_MODEL = os.environ.get("DASHBOARD_EMBEDDING_MODEL")
+
+# Columns of the hashed TF-IDF vectors
+DIMENSIONS = 256
+
+# Dense candidates re-scored with the exact TF-IDF cosine
+RERANK = 200
+
+# Texts tokenized at a time while building
+CHUNK_SIZE = 10_000
+
+# Tokens in more than this share of documents carry no signal and are skipped
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+# CSR rows: row i's columns are indices[indptr[i]:indptr[i + 1]]
+SparseVectors = namedtuple("SparseVectors", ["indptr", "indices", "data", "columns"])
+
+
+def _text(frame, columns):
+    text = frame[columns[0]].fillna("").astype(str)
+    for column in columns[1:]:
+        text = text + " " + frame[column].fillna("").astype(str)
+    return text
+
+
+def _term_counts(texts, chunk_size=CHUNK_SIZE):
+    """(doc, token code, term frequency) for each distinct token of each text, and the tokens.
+
+    Texts are tokenized a chunk at a time so only one chunk's token strings
+    are alive at once.
+    """
+    vocabulary = {}
+    docs, codes, counts = [], [], []
+    for start in range(0, len(texts), chunk_size):
+        tokens = texts.iloc[start:start + chunk_size].str.lower().str.findall(TOKEN_PATTERN)
+        lengths = tokens.str.len().to_numpy(dtype=np.int64)
+        local, uniques = pd.factorize(
+            np.fromiter(chain.from_iterable(tokens), dtype=object, count=lengths.sum())
+        )
+        chunk_docs = np.repeat(np.arange(start, start + len(lengths)), lengths)
+        pairs, tf = np.unique(chunk_docs * len(uniques) + local, return_counts=True)
+        chunk_docs, local = np.divmod(pairs, len(uniques))
+        mapping = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for token in uniques), dtype=np.int64, count=len(uniques)
+        )
+        docs.append(chunk_docs)
+        codes.append(mapping[local])
+        counts.append(tf)
+    return np.concatenate(docs), np.concatenate(codes), np.concatenate(counts), list(vocabulary)
+
+
+def tfidf(texts):
+    """L2-normalised TF-IDF vectors of ``texts`` as sparse rows, and the token of each column."""
+    n_docs = len(texts)
+    # Pairs come out grouped by doc, which is the CSR row order
+    docs, codes, tf, vocabulary = _term_counts(texts)
+    df = np.bincount(codes, minlength=len(vocabulary))
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    keep = df[codes] <= max(MAX_DOCUMENT_FREQUENCY * n_docs, 1)
+    docs, codes, weights = docs[keep], codes[keep], ((1 + np.log(tf)) * idf[codes])[keep]
+    norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n_docs))
+    weights /= norms[docs]
+    indptr = np.zeros(n_docs + 1, dtype=np.int64)
+    np.cumsum(np.bincount(docs, minlength=n_docs), out=indptr[1:])
+    vectors = SparseVectors(indptr, codes.astype(np.int32), weights.astype(np.float32), len(vocabulary))
+    return vectors, vocabulary
+
+
+def project(vectors, vocabulary, dimensions=DIMENSIONS):
+    """Fold sparse vectors into ``dimensions`` L2-normalised float32 columns by signed feature hashing."""
+    n_docs = len(vectors.indptr) - 1
+    docs = np.repeat(np.arange(n_docs), np.diff(vectors.indptr))
+    # crc32 rather than hash() so vectors are identical in every process
+    hashes = np.fromiter((zlib.crc32(token.encode()) for token in vocabulary), dtype=np.uint32, count=len(vocabulary))
+    buckets = (hashes % dimensions).astype(np.int64)[vectors.indices]
+    signs = np.where(hashes & (1 << 31), -1.0, 1.0)[vectors.indices]
+    dense = np.bincount(docs * dimensions + buckets, weights=vectors.data * signs, minlength=n_docs * dimensions)
+    dense = dense.reshape(n_docs, dimensions).astype(np.float32)
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    np.divide(dense, norms, out=dense, where=norms > 0)
+    return dense
+
+
+def embed(texts):
+    """(dense float32 vectors, exact sparse vectors or None) for ``texts``."""
+    if EMBEDDING_MODEL:
+        try:
+            # Imported only when a model is configured, since it pulls in torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:  # optional: the TF-IDF fallback is used without it
+            pass
+        else:
+            model = SentenceTransformer(EMBEDDING_MODEL)
+            vectors = model.encode(texts.tolist(), normalize_embeddings=True, convert_to_numpy=True)
+            return vectors.astype(np.float32), None
+    sparse, vocabulary = tfidf(texts)
+    return project(sparse, vocabulary), sparse
+
+
+def _sparse_dot(vectors, row, candidates):
+    """Dot products of sparse row ``row`` with each of the ``candidates`` rows."""
+    query = np.zeros(vectors.columns, dtype=np.float32)
+    lo, hi = vectors.indptr[row], vectors.indptr[row + 1]
+    query[vectors.indices[lo:hi]] = vectors.data[lo:hi]
+    starts = vectors.indptr[candidates]
+    lengths = vectors.indptr[candidates + 1] - starts
+    within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(starts, lengths) + within
+    products = query[vectors.indices[positions]] * vectors.data[positions]
+    return np.bincount(np.repeat(np.arange(len(candidates)), lengths), weights=products, minlength=len(candidates))
+
+
+class SimilarityIndex:
+    def __init__(self, ids, vectors, exact=None):
+        # Rows in snapshot order, like the search and filter indexes, so filter masks apply directly
+        self.ids = ids
+        self.vectors = vectors
+        self._order = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._order]
+        # Sparse vectors that re-score the dense candidates; None when the dense ones are exact
+        self.exact = exact
+        self.nbytes = ids.nbytes + vectors.nbytes + self._order.nbytes + self._sorted_ids.nbytes
+        if exact is not None:
+            self.nbytes += exact.indptr.nbytes + exact.indices.nbytes + exact.data.nbytes
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_frame(cls, frame, id_column, columns):
+        """Vectors for ``frame``'s rows from the text in ``columns``."""
+        ids = frame[id_column].to_numpy(dtype=np.int64)
+        if not len(ids):
+            return cls(ids, np.zeros((0, DIMENSIONS), dtype=np.float32))
+        return cls(ids, *embed(_text(frame, list(columns))))
+
+    def similar(self, row_id, limit=5, mask=None):
+        """Up to ``limit`` (id, score) pairs most similar to ``row_id``, best first.
+
+        ``mask`` optionally restricts candidates, aligned with ``self.ids``.
+        Returns an empty list for an unknown id.
+        """
+        found = np.searchsorted(self._sorted_ids, row_id)
+        if found >= len(self.ids) or self._sorted_ids[found] != row_id:
+            return []
+        position = self._order[found]
+        scores = self.vectors @ self.vectors[position]
+        scores[position] = -np.inf
+        if mask is not None:
+            scores[~mask] = -np.inf
+        candidates = min(max(limit, RERANK) if self.exact is not None else limit, int(np.isfinite(scores).sum()))
+        if candidates <= 0:
+            return []
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if self.exact is not None:
+            scores = np.full(len(scores), -np.inf)
+            scores[top] = _sparse_dot(self.exact, position, top)
+        top = top[np.argsort(-scores[top], kind="stable")][:limit]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
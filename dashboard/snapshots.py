@@ -0,0 +1,387 @@
+"""Incrementally refreshed local mirrors of the dashboard tables.
+
+A ``TableSnapshot`` loads its table once, then on each refresh asks only for
+rows whose ``LAST_UPDATED`` reached the stored high-water mark and upserts
+them by id. Deletions are caught with a one-row count/id-sum fingerprint;
+the full id column is read only when that fingerprint disagrees.
+
+``version`` changes exactly when the mirrored data does, so caches keyed on
+it stay valid indefinitely instead of expiring on a timer. It includes a
+hash of the rows stamped at the high-water mark: those come back with every
+delta, and a second write within the same timestamp only shows up as a
+different hash.
+
+When given a directory, a snapshot is also persisted as an uncompressed
+Arrow IPC file. On startup the file is memory-mapped and served straight
+away while the warehouse is revalidated in a background thread; because the
+columns stay Arrow-backed, every worker process on the host shares the same
+page-cache copy instead of holding its own. To keep it that way, a worker
+whose refresh finds new data first adopts a newer file another worker wrote,
+and only rewrites the file (under a lock file) when it still holds an older
+version. Persistence needs ``pyarrow`` and is skipped without it.
+
+The mirror is kept compact: low-cardinality columns are dictionary-encoded
+categoricals, remaining strings are Arrow-backed, and long text
+(``TEXT_COLUMNS``) is split off the hot ``frame`` into ``text``, which only
+the search indexes and ``text_by_id`` read; the dashboard's card loaders use
+the latter instead of fetching that text from the warehouse.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard import queries
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - pyarrow ships with the Snowflake connector
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; writers then only compare versions
+    fcntl = None
+
+# Columns mirrored locally: ids, filter columns and the text the search index needs
+SNAPSHOT_COLUMNS = {
+    queries.SUBSIDIARIES.name: (
+        "SUBSIDIARY_ID", "COMPANY_NAME", "BUSINESS_SEGMENT", "DESCRIPTION", "LAST_UPDATED",
+    ),
+    queries.PRODUCTS.name: (
+        "PRODUCT_SERVICE_ID", "SUBSIDIARY_ID", "SUBSIDIARY_NAME", "BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY",
+        "PRODUCT_SERVICE_NAME", "TARGET_MARKET", "DESCRIPTION", "KEY_FEATURES", "LAST_UPDATED",
+    ),
+}
+
+# Low-cardinality columns stored as categoricals rather than one string per row
+CATEGORY_COLUMNS = ("BUSINESS_SEGMENT", "PRODUCT_SERVICE_CATEGORY", "SUBSIDIARY_NAME", "TARGET_MARKET")
+
+# Long free text kept out of the hot frame and looked up by id
+TEXT_COLUMNS = ("DESCRIPTION", "KEY_FEATURES")
+
+STRING_DTYPE = pd.StringDtype("pyarrow") if pa is not None else pd.StringDtype()
+
+# Minimum seconds between refresh checks against the warehouse
+REFRESH_INTERVAL = 60
+
+# Bump when the on-disk layout changes so stale files are ignored
+SNAPSHOT_FORMAT = 3
+
+_METADATA_KEY = b"dashboard_snapshot"
+
+# One published version of a snapshot's data. A refresh builds a new one and
+# swaps it in with a single assignment, so a reader holding a state never sees
+# the frame of one version next to the text of another.
+SnapshotState = namedtuple("SnapshotState", ["frame", "text", "high_water_mark", "version"])
+
+
+def compact_frame(frame):
+    """Return ``frame`` with category columns dictionary-encoded and other strings Arrow-backed."""
+    columns = {}
+    for column in frame.columns:
+        values = frame[column]
+        if column in CATEGORY_COLUMNS:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+        elif pd.api.types.is_object_dtype(values.dtype) or pd.api.types.is_string_dtype(values.dtype):
+            values = values.astype(STRING_DTYPE)
+        columns[column] = values
+    return pd.DataFrame(columns)
+
+
+def rows_hash(frame):
+    """Order-independent hash of ``frame``'s rows, the same whichever dtypes hold the values.
+
+    Deltas arrive as plain numpy/str columns while the mirror holds
+    categoricals and Arrow types, so values are normalised before hashing.
+    """
+    columns = {}
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_datetime64_any_dtype(values.dtype) or (
+            isinstance(values.dtype, pd.ArrowDtype) and pa.types.is_timestamp(values.dtype.pyarrow_dtype)
+        ):
+            values = pd.to_datetime(values.astype(object)).astype("datetime64[us]")
+        elif pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("float64")
+        else:
+            values = values.astype(object).where(values.notna(), None).astype(pd.StringDtype())
+        columns[column] = values.reset_index(drop=True)
+    if not columns:
+        return 0
+    return int(pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).sum())
+
+
+def _arrow_dtype(arrow_type):
+    # Dictionary columns come back as pandas categoricals, everything else stays Arrow-backed
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+class TableSnapshot:
+    def __init__(self, spec, columns=None, directory=None):
+        self.spec = spec
+        self.columns = tuple(columns or SNAPSHOT_COLUMNS[spec.name])
+        self.directory = Path(directory) if directory and pa is not None else None
+        self.state = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self._revalidating = False
+
+    @property
+    def path(self):
+        if self.directory is None:
+            return None
+        return self.directory / f"{self.spec.name}.arrow"
+
+    @property
+    def frame(self):
+        return None if self.state is None else self.state.frame
+
+    @property
+    def text(self):
+        return None if self.state is None else self.state.text
+
+    @property
+    def high_water_mark(self):
+        return None if self.state is None else self.state.high_water_mark
+
+    @property
+    def version(self):
+        return None if self.state is None else self.state.version
+
+    @property
+    def text_columns(self):
+        return tuple(column for column in self.columns if column in TEXT_COLUMNS)
+
+    def text_by_id(self, ids, columns=None, state=None):
+        """Long-text columns for ``ids`` (in that order); unknown ids are dropped."""
+        text = (state or self.state).text
+        id_column = self.spec.id_column
+        known = text[id_column].to_numpy(dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        positions = np.clip(np.searchsorted(known, ids), 0, max(len(known) - 1, 0))
+        found = positions[known[positions] == ids] if len(known) else positions[:0]
+        return text.iloc[found][[id_column, *(columns or self.text_columns)]].reset_index(drop=True)
+
+    def search_frame(self, state=None):
+        """Ids plus the spec's search columns, gathered from the hot frame and the text store of ``state``."""
+        state = state or self.state
+        parts = [state.frame[[self.spec.id_column]]]
+        for column in self.spec.search_columns:
+            source = state.text if column in self.text_columns else state.frame
+            parts.append(source[[column]])
+        return pd.concat(parts, axis=1)
+
+    def memory_usage(self):
+        """Bytes held by the hot frame and by the text store."""
+        state = self.state
+        if state is None:
+            return {"frame": 0, "text": 0}
+        return {
+            "frame": int(state.frame.memory_usage(deep=True).sum()),
+            "text": int(state.text.memory_usage(deep=True).sum()),
+        }
+
+    def refresh(self, backend, max_age=REFRESH_INTERVAL, background=False):
+        """Bring the mirror up to date if it was last checked over ``max_age`` seconds ago.
+
+        With ``background=True`` a snapshot that already has data (from memory
+        or disk) is returned as-is and revalidated on a daemon thread; only an
+        empty snapshot blocks. Returns True when the data changed in this call.
+        """
+        if self.state is None:
+            with self._lock:
+                if self.state is None:
+                    # checked_at stays 0, so a copy read from disk is revalidated below
+                    self._load_from_disk()
+        if self.state is not None and time.monotonic() - self.checked_at < max_age:
+            return False
+        if background and self.state is not None:
+            self._revalidate_in_background(backend, max_age)
+            return False
+        return self._refresh(backend, max_age)
+
+    def _refresh(self, backend, max_age):
+        with self._lock:
+            if self.state is not None and time.monotonic() - self.checked_at < max_age:
+                return False
+            if self.state is None:
+                changed = self._load(backend)
+            else:
+                # A sibling worker may already have saved newer data; start from its file
+                adopted = self._newer_on_disk() and self._load_from_disk()
+                changed = self._apply_delta(backend) or adopted
+            self.checked_at = time.monotonic()
+            if changed:
+                self._publish()
+            return changed
+
+    def _revalidate_in_background(self, backend, max_age):
+        with self._lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+
+        def run():
+            try:
+                self._refresh(backend, max_age)
+            finally:
+                self._revalidating = False
+
+        threading.Thread(target=run, name=f"refresh-{self.spec.name}", daemon=True).start()
+
+    def _load(self, backend):
+        frame = queries.select_rows(backend, self.spec, self.columns)
+        self._replace(frame)
+        return True
+
+    def _apply_delta(self, backend):
+        id_column = self.spec.id_column
+        state = self.state
+        delta = queries.changed_rows(backend, self.spec, self.columns, state.high_water_mark)
+        known_ids = state.frame[id_column]
+        frame = None
+        # Rows stamped exactly at the old high-water mark come back on every
+        # refresh. Newer stamps and unseen ids are changes; so are rows rewritten
+        # within the same timestamp, which only show up as a different hash
+        is_new = ~delta[id_column].isin(known_ids)
+        at_mark = delta["LAST_UPDATED"] == state.high_water_mark
+        if (
+            (delta["LAST_UPDATED"] > state.high_water_mark).any()
+            or is_new.any()
+            or rows_hash(delta[at_mark][list(self.columns)]) != state.version[-1]
+        ):
+            frame = self._full_frame(state)
+            frame = pd.concat([frame[~frame[id_column].isin(delta[id_column])], delta], ignore_index=True)
+            known_ids = frame[id_column]
+
+        row_count, id_sum = queries.id_fingerprint(backend, self.spec)
+        if row_count != len(known_ids) or id_sum != int(known_ids.sum()):
+            live_ids = queries.select_ids(backend, self.spec)
+            frame = self._full_frame(state) if frame is None else frame
+            frame = frame[frame[id_column].isin(live_ids)]
+
+        if frame is None:
+            return False
+        self._replace(frame)
+        return True
+
+    def _full_frame(self, state):
+        return pd.concat([state.frame, state.text.drop(columns=self.spec.id_column)], axis=1)[list(self.columns)]
+
+    def _replace(self, frame):
+        id_column = self.spec.id_column
+        frame = compact_frame(frame.sort_values(id_column, ignore_index=True))
+        high_water_mark = frame["LAST_UPDATED"].max() if len(frame) else pd.Timestamp.min
+        version = (
+            str(high_water_mark), len(frame), int(frame[id_column].sum()),
+            rows_hash(frame[frame["LAST_UPDATED"] == high_water_mark]),
+        )
+        self.state = self._state(frame, high_water_mark, version)
+
+    def _state(self, frame, high_water_mark, version):
+        text_columns = self.text_columns
+        return SnapshotState(
+            frame[[column for column in self.columns if column not in text_columns]],
+            frame[[self.spec.id_column, *text_columns]],
+            high_water_mark,
+            version,
+        )
+
+    def _publish(self):
+        """Share the current state through the snapshot file, writing it only if no other worker has."""
+        if self.path is None:
+            return
+        with self._file_lock():
+            # Another worker may have saved this or newer data meanwhile; serve that rather than rewrite it
+            if self._disk_version() != self.state.version and not self._newer_on_disk():
+                self._save_to_disk()
+            # Map the shared file so long text lives in the page cache, not the heap
+            self._load_from_disk()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _newer_on_disk(self):
+        """Whether the snapshot file holds a different version at least as recent as the one in memory."""
+        on_disk = self._disk_version()
+        return (
+            on_disk is not None and on_disk != self.state.version
+            and pd.Timestamp(on_disk[0]) >= self.state.high_water_mark
+        )
+
+    def _disk_version(self):
+        """Version in the snapshot file's header, or None when there is no usable file."""
+        path = self.path
+        if path is None or not path.exists():
+            return None
+        try:
+            # Only the footer and schema are read, not the columns
+            header = self._header(pa.ipc.open_file(pa.memory_map(str(path))).schema)
+        except (OSError, ValueError, pa.ArrowInvalid):
+            return None
+        return None if header is None else tuple(header["version"])
+
+    def _header(self, schema):
+        try:
+            header = json.loads((schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+        except ValueError:
+            return None
+        if header.get("format") != SNAPSHOT_FORMAT or tuple(header.get("columns", ())) != self.columns:
+            return None
+        return header
+
+    def _save_to_disk(self):
+        state = self.state
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "columns": list(self.columns),
+            "version": list(state.version),
+            "high_water_mark": str(state.high_water_mark),
+        }
+        table = pa.Table.from_pandas(self._full_frame(state), preserve_index=False)
+        table = table.replace_schema_metadata({_METADATA_KEY: json.dumps(header).encode()})
+        path = self.path
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with pa.OSFile(str(temporary), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        # Atomic swap: processes that mapped the old file keep reading it safely
+        os.replace(temporary, path)
+
+    def _load_from_disk(self):
+        path = self.path
+        if path is None or not path.exists():
+            return False
+        try:
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        except (OSError, ValueError, pa.ArrowInvalid):
+            return False
+        header = self._header(table.schema)
+        if header is None:
+            return False
+        # ArrowDtype columns keep pointing into the memory map rather than copying
+        self.state = self._state(
+            table.to_pandas(types_mapper=_arrow_dtype), pd.Timestamp(header["high_water_mark"]), tuple(header["version"])
+        )
+        return True
@@ -0,0 +1,187 @@
+"""Per-stage timing for dashboard page runs.
+
+A page run (``page_run``) collects spans recorded with ``stage`` anywhere
+below it: warehouse queries, cached loader calls with their hit/miss,
+search filtering, aggregate builds and figure builds. Spans record wall
+time plus optional fields such as rows and bytes fetched. Time the page
+spends outside top-level stages is reported as ``render``.
+
+When a run finishes it is logged as one JSON line at INFO on the
+``dashboard.telemetry`` logger, and its total is added to a per-page
+rolling window from which ``latency_percentiles`` reports p50/p95. The
+logger has no handler of its own: set ``DASHBOARD_TELEMETRY_LOG=1`` to have
+``configure_logging`` write the lines to stderr, or route the logger in the
+host's logging configuration.
+
+The current run lives in a context variable, so code outside a page run
+(background refreshes, scripts) records nothing. Work handed to other
+threads keeps reporting into the run when submitted through
+``copy_context().run``.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("dashboard.telemetry")
+
+# Set DASHBOARD_TELEMETRY_LOG=1 to write each page run's JSON line to stderr
+LOG_RUNS = os.environ.get("DASHBOARD_TELEMETRY_LOG", "0") == "1"
+
+# Page totals kept per page for the latency percentiles
+LATENCY_WINDOW = 1000
+
+_current_run = ContextVar("telemetry_run", default=None)
+_depth = ContextVar("telemetry_depth", default=0)
+_cache_span = ContextVar("telemetry_cache_span", default=None)
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+class PageRun:
+    def __init__(self, page):
+        self.page = page
+        self.spans = []
+        self.total_ms = None
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def render_ms(self):
+        """Page time not spent inside a top-level stage."""
+        if self.total_ms is None:
+            return None
+        return max(self.total_ms - sum(span["ms"] for span in self.spans if span["depth"] == 0), 0.0)
+
+    def to_record(self):
+        return {
+            "event": "page_run",
+            "page": self.page,
+            "total_ms": round(self.total_ms, 3),
+            "render_ms": round(self.render_ms, 3),
+            "spans": self.spans,
+        }
+
+    def to_frame(self):
+        """Spans plus a ``render`` row, one row per stage."""
+        rows = self.spans + [{"stage": "render", "ms": self.render_ms, "depth": 0}]
+        return pd.DataFrame(rows).drop(columns="depth")
+
+
+@contextmanager
+def page_run(page):
+    """Collect spans for one page render; yields the ``PageRun``."""
+    run = PageRun(page)
+    token = _current_run.set(run)
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run.total_ms = (time.perf_counter() - start) * 1000
+        _current_run.reset(token)
+        with _latencies_lock:
+            _latencies.setdefault(page, deque(maxlen=LATENCY_WINDOW)).append(run.total_ms)
+        logger.info(json.dumps(run.to_record(), default=str))
+
+
+def configure_logging(enabled=LOG_RUNS):
+    """Attach a stderr handler at INFO to the telemetry logger, once per process."""
+    if not enabled or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+@contextmanager
+def stage(name, **fields):
+    """Time the enclosed block as a span of the current page run.
+
+    Yields a dict that the block may add fields to (rows, bytes, ...).
+    Outside a page run the span is discarded.
+    """
+    run = _current_run.get()
+    span = {"stage": name, **fields}
+    if run is None:
+        yield span
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        _depth.reset(token)
+        span["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        span["depth"] = depth
+        span["thread"] = threading.current_thread().name
+        run.add(span)
+
+
+def frame_bytes(frame):
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def record_frame(span, frame):
+    """Add ``frame``'s row count and memory to ``span``; skipped outside a page run."""
+    if _current_run.get() is not None:
+        span["rows"] = len(frame)
+        span["bytes"] = frame_bytes(frame)
+
+
+def cached(cached_func):
+    """Wrap an ``st.cache_data`` function so each call is a ``cache`` span.
+
+    The span's ``hit`` is False when the underlying function ran, which
+    ``cache_miss`` marks from inside the cache.
+    """
+    @wraps(cached_func)
+    def wrapper(*args, **kwargs):
+        with stage("cache", loader=cached_func.__name__, hit=True) as span:
+            token = _cache_span.set(span)
+            try:
+                result = cached_func(*args, **kwargs)
+            finally:
+                _cache_span.reset(token)
+            if isinstance(result, pd.DataFrame):
+                record_frame(span, result)
+            return result
+    return wrapper
+
+
+def cache_miss(func):
+    """Mark the enclosing ``cached`` span as a miss whenever ``func`` actually runs."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        span = _cache_span.get()
+        if span is not None:
+            span["hit"] = False
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def latency_percentiles():
+    """Per page: number of runs and p50/p95 total latency in ms."""
+    with _latencies_lock:
+        samples = {page: np.fromiter(values, dtype=np.float64) for page, values in _latencies.items()}
+    return pd.DataFrame(
+        [
+            {"page": page, "runs": len(values), "p50_ms": np.percentile(values, 50), "p95_ms": np.percentile(values, 95)}
+            for page, values in samples.items()
+        ],
+        columns=["page", "runs", "p50_ms", "p95_ms"],
+    )
@@ -0,0 +1,199 @@
+"""Per-company data partitions for serving many companies from one process.
+
+Every company gets its own ``CompanyData``: a backend bound to its schema,
+its table snapshots (persisted under its own directory) and its search
+indexes. ``CompanyCache`` keeps these partitions in least-recently-used
+order and evicts the coldest ones once a company count or memory budget is
+exceeded, so one process can serve dozens of companies without holding all
+of them at once. An evicted company reloads from its on-disk snapshot.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from dashboard import queries
+from dashboard.filters import FilterIndex
+from dashboard.relations import ProductIndex
+from dashboard.search_index import SearchIndex, field_weights
+from dashboard.similarity import SimilarityIndex
+from dashboard.snapshots import TableSnapshot
+
+# Cache key for everything derived from one company's data at one point in time
+DataVersion = namedtuple("DataVersion", ["company", "subsidiaries", "products"])
+
+MAX_COMPANIES = 8
+MAX_BYTES = 1 << 30
+
+
+class CompanyData:
+    def __init__(self, company, backend, snapshot_dir=None):
+        self.company = company
+        self.backend = backend
+        directory = Path(snapshot_dir) / company.database / company.schema if snapshot_dir else None
+        self.snapshots = {
+            name: TableSnapshot(spec, directory=directory) for name, spec in queries.TABLES.items()
+        }
+        self._indexes = {}
+        # (key, snapshot version) -> Future of the build in progress
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, background=True):
+        """Refresh both snapshots (see ``TableSnapshot.refresh``) and return the data version.
+
+        Snapshots that have nothing in memory yet are loaded concurrently, so
+        a cold start waits for the slowest table rather than the sum of both.
+        """
+        cold = [snapshot for snapshot in self.snapshots.values() if snapshot.state is None]
+        if len(cold) > 1:
+            with ThreadPoolExecutor(max_workers=len(cold), thread_name_prefix="snapshot") as pool:
+                # Consume the results so load errors propagate to the caller
+                list(pool.map(lambda snapshot: snapshot.refresh(self.backend, background=background), cold))
+        for snapshot in self.snapshots.values():
+            snapshot.refresh(self.backend, background=background)
+        return DataVersion(
+            self.company,
+            self.snapshots[queries.SUBSIDIARIES.name].version,
+            self.snapshots[queries.PRODUCTS.name].version,
+        )
+
+    def search_index(self, table, state=None):
+        """The table's search index, rebuilt only when its snapshot version moved."""
+        spec = queries.TABLES[table]
+        return self._derived(
+            ("search", table), table,
+            lambda snapshot, state: SearchIndex.from_frame(
+                snapshot.search_frame(state), spec.id_column, field_weights(spec.search_columns)
+            ),
+            state,
+        )
+
+    def filter_index(self, table, state=None):
+        """Per-value row bitmaps for the table's filter columns, rebuilt when its snapshot moved."""
+        return self._derived(
+            ("filters", table), table, lambda snapshot, state: FilterIndex.from_frame(state.frame), state
+        )
+
+    def search_scope(self, table, filters):
+        """The table's search index and a mask over its rows for ``(column, values)`` filters.
+
+        ``values`` of None leaves that column unfiltered, and the mask is None
+        when nothing is filtered. The mask is aligned by row position, so both
+        come from the same snapshot state even if a refresh lands in between.
+        """
+        state = self.snapshots[table].state
+        index = self.search_index(table, state)
+        if all(values is None for _, values in filters):
+            return index, None
+        return index, self.filter_index(table, state).mask(filters)
+
+    def product_index(self):
+        """Subsidiary id -> products, rebuilt only when the products snapshot moved."""
+        return self._derived(
+            ("products",), queries.PRODUCTS.name, lambda snapshot, state: ProductIndex.from_frame(state.frame)
+        )
+
+    def similarity_index(self):
+        """Product text vectors for similar-product lookups, rebuilt only when the products snapshot moved."""
+        spec = queries.PRODUCTS
+        return self._derived(
+            ("similar", spec.name), spec.name,
+            lambda snapshot, state: SimilarityIndex.from_frame(
+                snapshot.search_frame(state), spec.id_column, spec.search_columns
+            ),
+        )
+
+    def _derived(self, key, table, build, state=None):
+        """``build(snapshot, state)``, cached until the snapshot version moves.
+
+        ``state`` defaults to the snapshot's current state, read once up front,
+        so a refresh landing mid-build cannot mix two versions. Builds run outside the
+        lock, so a slow index never blocks lookups of other keys; concurrent
+        callers of the same key and version wait on the one build in progress.
+        """
+        snapshot = self.snapshots[table]
+        state = state or snapshot.state
+        with self._lock:
+            version = state.version
+            built, value = self._indexes.get(key, (None, None))
+            if value is not None and built == version:
+                return value
+            future = self._building.get((key, version))
+            if future is not None:
+                building = False
+            else:
+                building = True
+                future = self._building[key, version] = Future()
+        if not building:
+            return future.result()
+        try:
+            value = build(snapshot, state)
+        except BaseException as error:
+            with self._lock:
+                del self._building[key, version]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            del self._building[key, version]
+            # A build for an older version finishing late must not replace a newer one
+            if version == snapshot.version or key not in self._indexes:
+                self._indexes[key] = (version, value)
+        future.set_result(value)
+        return value
+
+    def table_memory_usage(self):
+        """Per table: bytes in the hot frame, the text store and the search index."""
+        usage = {}
+        for name, snapshot in self.snapshots.items():
+            usage[name] = dict(snapshot.memory_usage(), index=0)
+        for key, (_, index) in list(self._indexes.items()):
+            if key[0] in ("search", "filters", "similar"):
+                usage[key[1]]["index"] += index.nbytes
+        return usage
+
+    def memory_usage(self):
+        return sum(sum(table.values()) for table in self.table_memory_usage().values())
+
+
+class CompanyCache:
+    """LRU of ``CompanyData`` partitions bounded by count and total bytes."""
+
+    def __init__(self, backend, snapshot_dir=None, max_companies=MAX_COMPANIES, max_bytes=MAX_BYTES):
+        self.backend = backend
+        self.snapshot_dir = snapshot_dir
+        self.max_companies = max_companies
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, company):
+        return company in self._entries
+
+    def get(self, company):
+        with self._lock:
+            data = self._entries.get(company)
+            if data is None:
+                data = CompanyData(company, self.backend.for_company(company), self.snapshot_dir)
+                self._entries[company] = data
+            self._entries.move_to_end(company)
+            return data
+
+    def evict(self):
+        """Drop least-recently-used companies until back under budget.
+
+        The most recently used company is always kept. Returns the evicted companies.
+        """
+        evicted = []
+        with self._lock:
+            while len(self._entries) > 1:
+                over_count = len(self._entries) > self.max_companies
+                over_bytes = sum(data.memory_usage() for data in self._entries.values()) > self.max_bytes
+                if not (over_count or over_bytes):
+                    break
+                company, _ = self._entries.popitem(last=False)
+                evicted.append(company)
+        return evicted
+
+    def memory_usage(self):
+        return {company: data.memory_usage() for company, data in self._entries.items()}
@@ -0,0 +1,14 @@
+"""Dashboard pages, one module per page, each exposing ``show(version)``.
+
+The app imports only the selected page's module, so pages without charts
+never import Plotly.
+"""
+# Sidebar label -> module, in menu order
+PAGES = {
+    "Overview": "dashboard.views.overview",
+    "Subsidiaries": "dashboard.views.subsidiaries",
+    "Products & Services": "dashboard.views.products",
+    "Business Segments": "dashboard.views.segments",
+    "Analytics": "dashboard.views.analytics",
+    "Change History": "dashboard.views.history",
+}
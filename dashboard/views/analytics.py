@@ -0,0 +1,76 @@
+"""Analytics page: data quality, cross-segment portfolio and summary statistics."""
+import streamlit as st
+
+from dashboard import figures, queries
+from dashboard.loaders import load_aggregates, load_figure, load_quality_report
+
+TABLE_LABELS = {
+    queries.SUBSIDIARIES.name: "Subsidiaries",
+    queries.PRODUCTS.name: "Products & Services",
+}
+
+
+def show(version):
+    st.markdown('<h1 class="main-header">Analytics & Insights</h1>', unsafe_allow_html=True)
+    
+    aggregates = load_aggregates(version)
+    
+    # Data quality metrics
+    st.markdown('<h3 class="section-header">Data Quality Metrics</h3>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Subsidiaries Data Quality**")
+        
+        # Data completeness, precomputed with the other aggregates
+        st.plotly_chart(load_figure(version, "Analytics", "subsidiary_completeness"), use_container_width=True)
+    
+    with col2:
+        st.markdown("**Products Data Quality**")
+        
+        # Data completeness for products
+        st.plotly_chart(load_figure(version, "Analytics", "product_completeness"), use_container_width=True)
+    
+    # Validation checks, precomputed in the background for this data version
+    st.markdown('<h3 class="section-header">Validation Checks</h3>', unsafe_allow_html=True)
+    
+    report = load_quality_report(version)
+    summary = report.summary.assign(TABLE=report.summary['TABLE'].map(TABLE_LABELS))
+    st.dataframe(
+        summary.rename(columns={
+            'TABLE': 'Table', 'CHECK': 'Check', 'DESCRIPTION': 'Rule',
+            'ROWS': 'Rows', 'FAILED': 'Failed', 'PASS_RATE': 'Pass Rate (%)',
+        }).round({'Pass Rate (%)': 1}),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    for table, check in report.failed_checks():
+        with st.expander(f"{TABLE_LABELS[table]}: {check}"):
+            st.dataframe(report.examples[table, check], use_container_width=True, hide_index=True)
+    
+    # Cross-segment analysis
+    st.markdown('<h3 class="section-header">Cross-Segment Analysis</h3>', unsafe_allow_html=True)
+    
+    # Create bubble chart showing relationship between subsidiaries and products
+    st.plotly_chart(load_figure(version, "Analytics", "portfolio"), use_container_width=True)
+    
+    # Summary statistics
+    st.markdown('<h3 class="section-header">Summary Statistics</h3>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Subsidiary Statistics**")
+        st.dataframe(
+            figures.portfolio_summary(aggregates)[['Subsidiary_Count', 'Product_Count', 'Category_Count']].describe(),
+            use_container_width=True
+        )
+    
+    with col2:
+        st.markdown("**Top Product Categories**")
+        top_categories = aggregates.category_counts(limit=10)
+        st.dataframe(
+            top_categories.set_index('PRODUCT_SERVICE_CATEGORY').rename(columns={'PRODUCT_COUNT': 'Count'})
+        )
@@ -0,0 +1,55 @@
+"""Change History page: what changed in either table between two dates."""
+from datetime import date, datetime, time, timedelta
+
+import streamlit as st
+
+from dashboard import history, queries
+from dashboard.loaders import load_changes
+
+TABLE_OPTIONS = {
+    "Subsidiaries": queries.SUBSIDIARIES.name,
+    "Products & Services": queries.PRODUCTS.name,
+}
+
+DEFAULT_DAYS = 30
+
+
+def show(version):
+    st.markdown('<h1 class="main-header">Change History</h1>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        table = st.selectbox("Table", options=list(TABLE_OPTIONS))
+    
+    with col2:
+        start_date = st.date_input("From", value=date.today() - timedelta(days=DEFAULT_DAYS))
+    
+    with col3:
+        end_date = st.date_input("To", value=date.today())
+    
+    if start_date > end_date:
+        st.warning("'From' must not be later than 'To'.")
+        return
+    
+    # The state at the start of the first day against the state at the end of the last
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    changes = load_changes(version, TABLE_OPTIONS[table], start, end)
+    if changes is None:
+        st.info("Change tracking is not set up for this company yet: run `python -m dashboard.history install`.")
+        return
+    
+    counts = changes.drop_duplicates(["CHANGE", "ID"])["CHANGE"].value_counts()
+    for column, change in zip(st.columns(len(history.CHANGE_LABELS)), history.CHANGE_LABELS.values()):
+        with column:
+            st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+            st.metric(f"Rows {change.lower()}", int(counts.get(change, 0)))
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    if changes.empty:
+        st.info("No changes in this period.")
+        return
+    
+    st.markdown('<h3 class="section-header">Changes</h3>', unsafe_allow_html=True)
+    st.dataframe(changes, use_container_width=True, hide_index=True)
@@ -0,0 +1,59 @@
+"""Overview page: headline metrics, segment and category charts, recent updates."""
+import streamlit as st
+
+from dashboard.loaders import load_aggregates, load_concurrently, load_figure, load_recent_updates
+
+
+def show(version):
+    company = version.company.label
+    st.markdown(f'<h1 class="main-header">{company} Group Subsidiaries Analysis</h1>', unsafe_allow_html=True)
+    st.markdown(f"**Comprehensive analysis of {company} Group's global subsidiary structure and operations**")
+    
+    aggregates, recent_updates = load_concurrently(
+        (load_aggregates, version),
+        (load_recent_updates, version, 5),
+    )
+    metrics = aggregates.overview_metrics()
+    
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+        st.metric("Total Subsidiaries", metrics['TOTAL_SUBSIDIARIES'])
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+        st.metric("Business Segments", metrics['BUSINESS_SEGMENTS'])
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+        st.metric("Product Categories", metrics['PRODUCT_CATEGORIES'])
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+        st.metric("Total Products/Services", metrics['TOTAL_PRODUCTS'])
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Visualizations
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<h3 class="section-header">Subsidiaries by Business Segment</h3>', unsafe_allow_html=True)
+        st.plotly_chart(load_figure(version, "Overview", "segments"), use_container_width=True)
+    
+    with col2:
+        st.markdown('<h3 class="section-header">Products/Services by Category</h3>', unsafe_allow_html=True)
+        st.plotly_chart(load_figure(version, "Overview", "categories"), use_container_width=True)
+    
+    # Business segment deep dive
+    st.markdown('<h3 class="section-header">Business Segment Analysis</h3>', unsafe_allow_html=True)
+    
+    st.plotly_chart(load_figure(version, "Overview", "segment_comparison"), use_container_width=True)
+    
+    # Recent updates
+    st.markdown('<h3 class="section-header">Recent Updates</h3>', unsafe_allow_html=True)
+    st.dataframe(recent_updates, use_container_width=True)
@@ -0,0 +1,131 @@
+"""Products & Services page: a filtered, searchable and paginated product catalog."""
+import streamlit as st
+
+from dashboard import queries, telemetry
+from dashboard.loaders import (
+    filter_count,
+    filter_options,
+    load_aggregates,
+    load_concurrently,
+    load_products,
+    load_rows_by_id,
+    search_scope,
+    similar_products,
+)
+from dashboard.widgets import paginate, selection_filter
+
+SIMILAR_KEY = "similar_to"
+
+def _show_similar(product_id):
+    st.session_state[SIMILAR_KEY] = product_id
+
+def _hide_similar():
+    st.session_state.pop(SIMILAR_KEY, None)
+
+def show_similar(version, product_id):
+    """List the products whose text is closest to ``product_id``'s."""
+    matches = similar_products(version, product_id)
+    if not matches:
+        st.info("No similar products found.")
+        return
+    ids = tuple(match_id for match_id, _ in matches)
+    rows = load_rows_by_id(version, queries.PRODUCTS.name, ids, queries.PRODUCT_CARD_COLUMNS)
+    rows = rows.set_index('PRODUCT_SERVICE_ID')
+    for match_id, score in matches:
+        if match_id not in rows.index:
+            continue
+        match = rows.loc[match_id]
+        st.markdown(
+            f"- **{match['PRODUCT_SERVICE_NAME']}** ({match['SUBSIDIARY_NAME']}, "
+            f"{match['PRODUCT_SERVICE_CATEGORY']}) · similarity {score:.2f}"
+        )
+
+
+def show(version):
+    st.markdown('<h1 class="main-header">Products & Services Catalog</h1>', unsafe_allow_html=True)
+    
+    segment_options, category_options, aggregates = load_concurrently(
+        (filter_options, version, queries.PRODUCTS.name, 'BUSINESS_SEGMENT'),
+        (filter_options, version, queries.PRODUCTS.name, 'PRODUCT_SERVICE_CATEGORY'),
+        (load_aggregates, version),
+    )
+    
+    # Filters
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        selected_segments = st.multiselect(
+            "Business Segment",
+            options=segment_options,
+            default=segment_options
+        )
+    
+    with col2:
+        selected_categories = st.multiselect(
+            "Product Category",
+            options=category_options,
+            default=category_options
+        )
+    
+    with col3:
+        search_term = st.text_input("Search products/services", placeholder="Enter product name or feature...")
+    
+    # Filter data; counts come from the filter bitmaps, searches are ranked by the token index
+    segments = selection_filter(selected_segments, segment_options)
+    categories = selection_filter(selected_categories, category_options)
+    search = search_term.strip()
+    if search:
+        with telemetry.stage("filter", table=queries.PRODUCTS.name):
+            index, mask = search_scope(
+                version,
+                queries.PRODUCTS.name,
+                (('BUSINESS_SEGMENT', segments), ('PRODUCT_SERVICE_CATEGORY', categories))
+            )
+            matching = index.count(search, mask=mask)
+    else:
+        with telemetry.stage("filter", table=queries.PRODUCTS.name):
+            matching = filter_count(
+                version,
+                queries.PRODUCTS.name,
+                (('BUSINESS_SEGMENT', segments), ('PRODUCT_SERVICE_CATEGORY', categories))
+            )
+    
+    st.write(f"**Showing {matching} of {aggregates.overview_metrics()['TOTAL_PRODUCTS']} products/services**")
+    
+    limit, offset = paginate("products", matching, (segments, categories, search))
+    if search:
+        with telemetry.stage("filter", table=queries.PRODUCTS.name):
+            page_ids = index.search(search, mask=mask, limit=offset + limit)[offset:]
+        page_df = load_rows_by_id(version, queries.PRODUCTS.name, tuple(page_ids.tolist()), queries.PRODUCT_CARD_COLUMNS)
+    else:
+        page_df = load_products(version, segments=segments, categories=categories, limit=limit, offset=offset)
+    
+    # Group the current page by category
+    for category, category_products in page_df.groupby('PRODUCT_SERVICE_CATEGORY', sort=False):
+        with st.expander(f"**{category}** ({len(category_products)} on this page)", expanded=True):
+            for _, product in category_products.iterrows():
+                st.markdown(f"#### {product['PRODUCT_SERVICE_NAME']}")
+                
+                col1, col2 = st.columns([2, 1])
+                
+                with col1:
+                    st.markdown(f"**Subsidiary:** {product['SUBSIDIARY_NAME']}")
+                    st.markdown(f"**Description:** {product['DESCRIPTION']}")
+                    st.markdown(f"**Key Features:** {product['KEY_FEATURES']}")
+                
+                with col2:
+                    st.markdown(f"**Target Market:** {product['TARGET_MARKET']}")
+                    if product['PRODUCT_URL']:
+                        st.markdown(f"[🔗 Product Info]({product['PRODUCT_URL']})")
+                    product_id = int(product['PRODUCT_SERVICE_ID'])
+                    if st.session_state.get(SIMILAR_KEY) == product_id:
+                        st.button("Hide similar", key=f"similar_{product_id}", on_click=_hide_similar)
+                    else:
+                        st.button("Similar products", key=f"similar_{product_id}",
+                                  on_click=_show_similar, args=(product_id,))
+                
+                if st.session_state.get(SIMILAR_KEY) == product_id:
+                    st.markdown("**Similar products**")
+                    show_similar(version, product_id)
+                
+                st.divider()
@@ -0,0 +1,70 @@
+"""Business Segments page: one segment's subsidiaries, metrics and categories."""
+import streamlit as st
+
+from dashboard import queries
+from dashboard.loaders import (
+    filter_options,
+    load_aggregates,
+    load_concurrently,
+    load_figure,
+    load_subsidiaries,
+    product_index,
+)
+
+
+def show(version):
+    st.markdown('<h1 class="main-header">Business Segments Analysis</h1>', unsafe_allow_html=True)
+    
+    segment_options, aggregates = load_concurrently(
+        (filter_options, version, queries.SUBSIDIARIES.name, 'BUSINESS_SEGMENT'),
+        (load_aggregates, version),
+    )
+    
+    # Segment selection
+    selected_segment = st.selectbox(
+        "Select Business Segment",
+        options=segment_options
+    )
+    
+    # Data for selected segment
+    segment_metrics = aggregates.segment_metrics(selected_segment)
+    calls = [
+        (load_subsidiaries, version, (selected_segment,),
+         ('SUBSIDIARY_ID', 'COMPANY_NAME', 'DESCRIPTION', 'MARKET_POSITION', 'WEBSITE_URL')),
+        (product_index, version),
+    ]
+    if segment_metrics['CATEGORIES'] > 0:
+        calls.append((load_figure, version, "Business Segments", "categories", selected_segment))
+    segment_subsidiaries, products, *fig_categories = load_concurrently(*calls)
+    
+    # Segment overview
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Subsidiaries", segment_metrics['SUBSIDIARIES'])
+    
+    with col2:
+        st.metric("Products/Services", segment_metrics['PRODUCTS'])
+    
+    with col3:
+        st.metric("Product Categories", segment_metrics['CATEGORIES'])
+    
+    # Segment details
+    st.markdown(f'<h3 class="section-header">{selected_segment} - Subsidiaries</h3>', unsafe_allow_html=True)
+    
+    if len(segment_subsidiaries) > 0:
+        # Display subsidiaries in this segment
+        for _, subsidiary in segment_subsidiaries.iterrows():
+            with st.container():
+                st.markdown(f"**{subsidiary['COMPANY_NAME']}**")
+                st.markdown(subsidiary['DESCRIPTION'])
+                st.markdown(f"*Market Position: {subsidiary['MARKET_POSITION']}*")
+                st.markdown(f"Products/Services: {products.count(subsidiary['SUBSIDIARY_ID'])}")
+                if subsidiary['WEBSITE_URL']:
+                    st.markdown(f"[Visit Website]({subsidiary['WEBSITE_URL']})")
+                st.divider()
+    
+    # Product categories in this segment
+    if fig_categories:
+        st.markdown(f'<h3 class="section-header">{selected_segment} - Product Categories</h3>', unsafe_allow_html=True)
+        st.plotly_chart(fig_categories[0], use_container_width=True)
@@ -0,0 +1,85 @@
+"""Subsidiaries page: a filtered, searchable and paginated subsidiary directory."""
+import streamlit as st
+
+from dashboard import queries, telemetry
+from dashboard.loaders import (
+    filter_count,
+    filter_options,
+    load_aggregates,
+    load_concurrently,
+    load_rows_by_id,
+    load_subsidiaries,
+    product_index,
+    search_scope,
+)
+from dashboard.widgets import paginate, selection_filter
+
+
+def show(version):
+    st.markdown('<h1 class="main-header">Subsidiaries Directory</h1>', unsafe_allow_html=True)
+    
+    segment_options, aggregates = load_concurrently(
+        (filter_options, version, queries.SUBSIDIARIES.name, 'BUSINESS_SEGMENT'),
+        (load_aggregates, version),
+    )
+    
+    # Filters
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        selected_segments = st.multiselect(
+            "Filter by Business Segment",
+            options=segment_options,
+            default=segment_options
+        )
+    
+    with col2:
+        search_term = st.text_input("Search subsidiaries", placeholder="Enter company name or description...")
+    
+    # Filter data; counts come from the filter bitmaps, searches are ranked by the token index
+    segments = selection_filter(selected_segments, segment_options)
+    search = search_term.strip()
+    if search:
+        with telemetry.stage("filter", table=queries.SUBSIDIARIES.name):
+            index, mask = search_scope(version, queries.SUBSIDIARIES.name, (('BUSINESS_SEGMENT', segments),))
+            matching = index.count(search, mask=mask)
+    else:
+        with telemetry.stage("filter", table=queries.SUBSIDIARIES.name):
+            matching = filter_count(version, queries.SUBSIDIARIES.name, (('BUSINESS_SEGMENT', segments),))
+    
+    st.write(f"**Showing {matching} of {aggregates.overview_metrics()['TOTAL_SUBSIDIARIES']} subsidiaries**")
+    
+    limit, offset = paginate("subsidiaries", matching, (segments, search))
+    if search:
+        with telemetry.stage("filter", table=queries.SUBSIDIARIES.name):
+            page_ids = index.search(search, mask=mask, limit=offset + limit)[offset:]
+        page_df = load_rows_by_id(version, queries.SUBSIDIARIES.name, tuple(page_ids.tolist()), queries.SUBSIDIARY_CARD_COLUMNS)
+    else:
+        page_df = load_subsidiaries(version, segments=segments, limit=limit, offset=offset)
+    
+    products = product_index(version)
+    
+    # Display the current page of subsidiaries
+    for _, subsidiary in page_df.iterrows():
+        with st.container():
+            st.markdown(f"### {subsidiary['COMPANY_NAME']}")
+            
+            col1, col2 = st.columns([3, 1])
+            
+            with col1:
+                st.markdown(f"**Business Segment:** {subsidiary['BUSINESS_SEGMENT']}")
+                st.markdown(f"**Description:** {subsidiary['DESCRIPTION']}")
+                st.markdown(f"**Key Products/Services:** {subsidiary['KEY_PRODUCTS_SERVICES']}")
+                st.markdown(f"**Market Position:** {subsidiary['MARKET_POSITION']}")
+                product_names = products.products(subsidiary['SUBSIDIARY_ID'])
+                if product_names:
+                    with st.expander(f"Products/Services ({len(product_names)})"):
+                        st.markdown("\n".join(f"- {name}" for name in product_names))
+            
+            with col2:
+                if subsidiary['WEBSITE_URL']:
+                    st.markdown(f"[🌐 Visit Website]({subsidiary['WEBSITE_URL']})")
+                st.markdown(f"**Created:** {subsidiary['CREATED_DATE'].strftime('%Y-%m-%d')}")
+                st.markdown(f"**Updated:** {subsidiary['LAST_UPDATED'].strftime('%Y-%m-%d')}")
+            
+            st.divider()
@@ -0,0 +1,94 @@
+"""Shared widgets: filter and pagination controls and the sidebar panels."""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from dashboard import telemetry
+from dashboard.backends import default_company
+from dashboard.loaders import get_backend, get_company_cache, get_result_cache, load_companies
+
+# Page styling, read once per process; Streamlit still needs it sent on every run
+STYLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "styles.css")
+
+@st.cache_resource
+def page_styles():
+    with open(STYLES_PATH, encoding="utf-8") as styles:
+        return f"<style>\n{styles.read()}</style>"
+
+def selection_filter(selected, options):
+    """Turn a multiselect value into a query filter; None when everything is selected."""
+    if len(selected) == len(options):
+        return None
+    return tuple(selected)
+
+# Directory pagination - only the visible page of cards is fetched and rendered
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+def _step_page(key, step):
+    st.session_state[key] = st.session_state.get(key, 1) + step
+
+def paginate(key, total_rows, filter_state):
+    """Render page controls for a directory and return (limit, offset).
+
+    Page size and the current page live in session state under ``key``; the
+    page resets to 1 whenever ``filter_state`` changes.
+    """
+    page_key = f"{key}_page"
+    filters_key = f"{key}_filters"
+    if st.session_state.get(filters_key) != filter_state:
+        st.session_state[filters_key] = filter_state
+        st.session_state[page_key] = 1
+    
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    
+    with col4:
+        page_size = st.selectbox("Cards per page", PAGE_SIZE_OPTIONS, index=1, key=f"{key}_page_size")
+    
+    page_count = max(1, -(-total_rows // page_size))
+    st.session_state[page_key] = min(max(st.session_state.get(page_key, 1), 1), page_count)
+    
+    with col1:
+        st.button("◀ Previous", key=f"{key}_prev", on_click=_step_page, args=(page_key, -1),
+                  disabled=st.session_state[page_key] <= 1)
+    with col2:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key=page_key)
+    with col3:
+        st.button("Next ▶", key=f"{key}_next", on_click=_step_page, args=(page_key, 1),
+                  disabled=page >= page_count)
+    
+    return page_size, (page - 1) * page_size
+
+def select_company():
+    """Sidebar company picker; defaults to the backend's own company."""
+    companies = load_companies()
+    default = default_company(companies, get_backend().company)
+    if len(companies) == 1:
+        return companies[0]
+    return st.sidebar.selectbox(
+        "Select Company", companies, index=companies.index(default), format_func=lambda company: company.label
+    )
+
+def show_memory_usage(version):
+    """Sidebar breakdown of the selected company's in-memory data per table."""
+    usage = get_company_cache().get(version.company).table_memory_usage()
+    with st.sidebar.expander("Memory Usage"):
+        st.dataframe(
+            pd.DataFrame.from_dict(usage, orient='index').rename(columns=str.title).div(2 ** 20).round(2),
+            use_container_width=True
+        )
+        st.caption("MB per table: hot frame, long text and search index")
+
+# Set DASHBOARD_DEBUG=1 to open the performance panel by default
+DEBUG_PANEL = os.environ.get("DASHBOARD_DEBUG", "0") == "1"
+
+def show_performance_panel(run):
+    """Sidebar timings for the page run that just finished, plus p50/p95 per page."""
+    with st.sidebar.expander("Performance", expanded=True):
+        st.markdown(f"**{run.page}:** {run.total_ms:.0f} ms")
+        st.dataframe(run.to_frame(), use_container_width=True, hide_index=True)
+        st.markdown("**Page latency (ms)**")
+        st.dataframe(telemetry.latency_percentiles().round(1), use_container_width=True, hide_index=True)
+        st.markdown("**Shared result cache**")
+        st.json(get_result_cache().summary())
+        st.caption("Each run is also logged as JSON on the `dashboard.telemetry` logger")
@@ -0,0 +1,15 @@
+import pytest
+
+from dashboard.backends import LocalBackend
+
+# Earlier than anything the tests write, so each change moves the high-water mark
+OLD_TIMESTAMP = "2020-01-01 00:00:00"
+
+
+@pytest.fixture
+def backend():
+    """An in-memory copy of the seed scripts with every row stamped ``OLD_TIMESTAMP``."""
+    backend = LocalBackend.from_seed_scripts()
+    for table in ("Subsidiaries", "Subsidiary_Products_Services"):
+        backend.execute(f"UPDATE {table} SET CREATED_DATE = %(at)s, LAST_UPDATED = %(at)s", {"at": OLD_TIMESTAMP})
+    return backend
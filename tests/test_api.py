@@ -0,0 +1,133 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from dashboard import queries
+from dashboard.api import DataAPI
+from dashboard.backends import Company
+
+
+@pytest.fixture
+def api(backend):
+    return DataAPI(backend)
+
+
+def get(api, path, if_none_match=None):
+    status, headers, body = api.handle(path, if_none_match)
+    return status, headers, json.loads(body) if body else None
+
+
+def test_rows_are_paged_with_a_total(api):
+    status, headers, body = get(api, "/products?limit=2&offset=1")
+    assert status == HTTPStatus.OK
+    assert headers["Content-Type"] == "application/json"
+    assert body["total"] == 25
+    assert (body["limit"], body["offset"]) == (2, 1)
+    assert len(body["items"]) == 2
+
+
+def segment_ids(backend, segment):
+    frame = backend.query(
+        f"SELECT PRODUCT_SERVICE_ID FROM {queries.PRODUCTS.name} WHERE BUSINESS_SEGMENT = %(segment)s",
+        {"segment": segment},
+    )
+    return set(frame["PRODUCT_SERVICE_ID"].tolist())
+
+
+def item_ids(body):
+    return {item["PRODUCT_SERVICE_ID"] for item in body["items"]}
+
+
+def test_filters_and_search(api, backend):
+    pharma = segment_ids(backend, "Pharmaceuticals")
+    _, _, body = get(api, "/products?segment=Pharmaceuticals&limit=500")
+    assert body["total"] == len(pharma)
+    assert item_ids(body) == pharma
+
+    _, _, body = get(api, "/products?q=diagnostics&limit=500")
+    assert body["total"] == len(body["items"]) > 0
+    _, _, filtered = get(api, "/products?q=diagnostics&segment=Diagnostics&limit=500")
+    assert 0 < filtered["total"] < body["total"]
+    assert item_ids(filtered) == item_ids(body) & segment_ids(backend, "Diagnostics")
+
+
+def test_etag_answers_if_none_match_with_304(api):
+    status, headers, _ = get(api, "/subsidiaries")
+    assert status == HTTPStatus.OK
+
+    status, not_modified, body = get(api, "/subsidiaries?limit=5", headers["ETag"])
+    assert status == HTTPStatus.NOT_MODIFIED
+    assert not_modified["ETag"] == headers["ETag"]
+    assert body is None
+    assert get(api, "/subsidiaries", '"other"')[0] == HTTPStatus.OK
+
+
+def test_etag_changes_with_the_data(api, backend):
+    _, headers, _ = get(api, "/subsidiaries")
+    backend.execute(
+        f"UPDATE {queries.SUBSIDIARIES.name} SET DESCRIPTION = 'Edited', LAST_UPDATED = '2021-01-01 00:00:00' "
+        "WHERE SUBSIDIARY_ID = 1"
+    )
+    data = api.companies.get(backend.company)
+    data.snapshots[queries.SUBSIDIARIES.name].refresh(backend, max_age=0)
+
+    status, changed, _ = get(api, "/subsidiaries", headers["ETag"])
+    assert status == HTTPStatus.OK
+    assert changed["ETag"] != headers["ETag"]
+
+
+@pytest.mark.parametrize("path, message", [
+    ("/products?limit=abc", "limit must be an integer"),
+    ("/products?limit=501", "limit must be between 0 and 500"),
+    ("/products?offset=-1", "offset must be >= 0"),
+])
+def test_bad_parameters_are_400(api, path, message):
+    assert get(api, path)[::2] == (HTTPStatus.BAD_REQUEST, {"error": message})
+
+
+@pytest.mark.parametrize("path", ["/nope", "/segments/Nope", "/segments", "/products/1", "/products?company=X.Y"])
+def test_unknown_paths_are_404(api, path):
+    status, _, body = get(api, path)
+    assert status == HTTPStatus.NOT_FOUND
+    assert "error" in body
+
+
+def test_unexpected_errors_are_a_json_500(api, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("secret detail")
+
+    monkeypatch.setitem(api.routes, "products", fail)
+    status, _, body = get(api, "/products")
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert body == {"error": "Internal server error"}
+
+
+def test_segment_and_completeness(api):
+    status, _, body = get(api, "/segments/Pharmaceuticals")
+    assert status == HTTPStatus.OK
+    assert body["subsidiaries"] == len(body["subsidiary_list"]) > 0
+    assert body["products"] == len(segment_ids(api.backend, "Pharmaceuticals"))
+
+    status, _, body = get(api, "/analytics/completeness")
+    assert status == HTTPStatus.OK
+    assert body
+
+
+def test_default_company_is_the_discovered_one(backend):
+    # Snowflake reports database and schema names upper-case
+    discovered = Company(backend.company.database.upper(), backend.company.schema.upper())
+
+    class Discovering:
+        company = backend.company
+
+        def list_companies(self):
+            return [discovered]
+
+        def for_company(self, company):
+            return backend
+
+    api = DataAPI(Discovering())
+    assert get(api, "/subsidiaries")[0] == HTTPStatus.OK
+    assert discovered in api.companies
+    assert backend.company not in api.companies
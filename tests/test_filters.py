@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import filters, queries
+from dashboard.filters import FilterIndex
+from dashboard.tenants import CompanyData
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    rows = 500
+    return pd.DataFrame({
+        # "Rare" covers under 1/32 of the rows, so it is stored as positions rather than a bitmap
+        "BUSINESS_SEGMENT": rng.choice(["Pharma", "Diagnostics", "Rare"], rows, p=[0.6, 0.39, 0.01]),
+        "PRODUCT_SERVICE_CATEGORY": rng.choice(["A", "B", "C", None], rows),
+    })
+
+
+@pytest.fixture
+def index(frame):
+    return FilterIndex.from_frame(frame)
+
+
+def expected_mask(frame, selection):
+    mask = np.ones(len(frame), dtype=bool)
+    for column, values in selection:
+        if values is not None:
+            mask &= frame[column].isin(values).to_numpy()
+    return mask
+
+
+SELECTIONS = [
+    (("BUSINESS_SEGMENT", None),),
+    (("BUSINESS_SEGMENT", ("Pharma",)),),
+    (("BUSINESS_SEGMENT", ("Rare",)),),
+    (("BUSINESS_SEGMENT", ("Pharma", "Rare")), ("PRODUCT_SERVICE_CATEGORY", ("A", "C"))),
+    (("BUSINESS_SEGMENT", ("Diagnostics",)), ("PRODUCT_SERVICE_CATEGORY", None)),
+    (("BUSINESS_SEGMENT", ()),),
+    (("BUSINESS_SEGMENT", ("Unknown",)),),
+]
+
+
+def test_options_are_the_sorted_distinct_values(index):
+    assert index.values["BUSINESS_SEGMENT"] == ["Diagnostics", "Pharma", "Rare"]
+    # Missing values are not an option and belong to no value
+    assert index.values["PRODUCT_SERVICE_CATEGORY"] == ["A", "B", "C"]
+    assert "TARGET_MARKET" not in index.values
+
+
+def test_rare_values_are_kept_as_positions(index):
+    assert index.row_sets["BUSINESS_SEGMENT"]["Pharma"].dtype == np.uint8
+    assert index.row_sets["BUSINESS_SEGMENT"]["Rare"].dtype == np.int32
+
+
+@pytest.mark.parametrize("selection", SELECTIONS)
+def test_selections_or_within_and_across_columns(frame, index, selection):
+    expected = expected_mask(frame, selection)
+    assert np.array_equal(index.mask(selection), expected)
+    assert index.count(selection) == expected.sum()
+    # A memoized selection gives the same answer
+    assert index.count(selection) == expected.sum()
+
+
+def test_counts_without_bitwise_count(frame, index, monkeypatch):
+    # NumPy < 2.0 has no np.bitwise_count
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    selection = SELECTIONS[3]
+    assert filters._bit_count(np.packbits(expected_mask(frame, selection))) == expected_mask(frame, selection).sum()
+    assert index.count(selection) == expected_mask(frame, selection).sum()
+
+
+def test_search_scope_aligns_the_mask_with_the_index(backend):
+    data = CompanyData(backend.company, backend)
+    data.refresh(background=False)
+    table = queries.PRODUCTS.name
+    segment = data.filter_index(table).values["BUSINESS_SEGMENT"][0]
+
+    index, mask = data.search_scope(table, (("BUSINESS_SEGMENT", (segment,)), ("PRODUCT_SERVICE_CATEGORY", None)))
+
+    frame = data.snapshots[table].frame
+    assert len(mask) == len(index)
+    assert np.array_equal(index.ids[mask], frame.loc[frame["BUSINESS_SEGMENT"] == segment, queries.PRODUCTS.id_column])
+    assert data.search_scope(table, (("BUSINESS_SEGMENT", None),))[1] is None
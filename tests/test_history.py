@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+
+from dashboard import history
+
+SPEC = history.PRODUCTS
+TABLE = SPEC.table
+LOG = history.log_table(SPEC)
+
+# The fixture's rows were created in 2020, so their baseline entries fall before START
+START = datetime(2021, 1, 1)
+END = datetime(2100, 1, 1)
+
+
+@pytest.fixture
+def backend(backend):
+    history.install(backend)
+    return backend
+
+
+def update(backend, product_id, **values):
+    assignments = ", ".join(f"{column} = %({column})s" for column in values)
+    backend.execute(f"UPDATE {TABLE} SET {assignments} WHERE {SPEC.id_column} = {product_id}", values)
+
+
+def changes(backend, start=START, end=END):
+    return history.diff(backend, SPEC, start, end)
+
+
+def test_install_is_idempotent(backend):
+    entries = backend.query(f"SELECT COUNT(*) AS N FROM {LOG}")["N"].iloc[0]
+    history.install(backend)
+    assert history.installed(backend, SPEC)
+    assert backend.query(f"SELECT COUNT(*) AS N FROM {LOG}")["N"].iloc[0] == entries
+
+
+def test_not_installed(backend):
+    backend.execute(f"DROP TABLE {LOG}")
+    assert not history.installed(backend, SPEC)
+
+
+def test_no_changes_in_range(backend):
+    assert changes(backend).empty
+
+
+def test_modified_fields(backend):
+    before = backend.query(f"SELECT TARGET_MARKET, PRODUCT_SERVICE_NAME FROM {TABLE} WHERE {SPEC.id_column} = 2")
+    update(backend, 2, TARGET_MARKET="Everyone")
+
+    diff = changes(backend)
+    assert diff[["CHANGE", "ID", "NAME", "FIELD", "BEFORE", "AFTER"]].values.tolist() == [[
+        "Modified", 2, before["PRODUCT_SERVICE_NAME"].iloc[0], "TARGET_MARKET", before["TARGET_MARKET"].iloc[0],
+        "Everyone",
+    ]]
+
+
+def test_added_and_removed_rows(backend):
+    removed = backend.query(f"SELECT PRODUCT_SERVICE_NAME FROM {TABLE} WHERE {SPEC.id_column} = 3").iloc[0, 0]
+    backend.execute(f"DELETE FROM {TABLE} WHERE {SPEC.id_column} = 3")
+    backend.execute(f"""
+        INSERT INTO {TABLE} (SUBSIDIARY_NAME, BUSINESS_SEGMENT, PRODUCT_SERVICE_CATEGORY, PRODUCT_SERVICE_NAME)
+        VALUES ('Genentech Inc.', 'Pharmaceuticals', 'Oncology', 'New product')
+    """)
+
+    diff = changes(backend)
+    assert sorted(zip(diff["CHANGE"], diff["NAME"])) == [("Added", "New product"), ("Removed", removed)]
+
+
+def test_edits_reverted_within_the_range_drop_out(backend):
+    original = backend.query(f"SELECT TARGET_MARKET FROM {TABLE} WHERE {SPEC.id_column} = 2")["TARGET_MARKET"].iloc[0]
+    update(backend, 2, TARGET_MARKET="Everyone")
+    update(backend, 2, TARGET_MARKET=original)
+    assert changes(backend).empty
+
+
+def test_untracked_updates_are_not_logged(backend):
+    entries = backend.query(f"SELECT COUNT(*) AS N FROM {LOG}")["N"].iloc[0]
+    update(backend, 2, LAST_UPDATED="2022-01-01 00:00:00")
+    assert backend.query(f"SELECT COUNT(*) AS N FROM {LOG}")["N"].iloc[0] == entries
+
+
+def test_diff_compares_the_state_at_both_ends(backend):
+    update(backend, 2, TARGET_MARKET="First")
+    backend.execute(f"UPDATE {LOG} SET CHANGED_AT = '2022-01-01 00:00:00' WHERE TARGET_MARKET = 'First'")
+    update(backend, 2, TARGET_MARKET="Second")
+
+    # Starting after the first edit, the diff runs from "First" to "Second"
+    diff = changes(backend, start=datetime(2023, 1, 1))
+    assert diff[["FIELD", "BEFORE", "AFTER"]].values.tolist() == [["TARGET_MARKET", "First", "Second"]]
+    # Ending before the second edit, only the first one shows
+    diff = changes(backend, end=datetime(2023, 1, 1))
+    assert diff["AFTER"].tolist() == ["First"]
+
+
+def test_log_watermark_moves_with_each_entry(backend):
+    watermark = history.log_watermark(backend, SPEC)
+    assert history.log_watermark(backend, SPEC) == watermark
+    update(backend, 2, TARGET_MARKET="Everyone")
+    assert history.log_watermark(backend, SPEC) != watermark
@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+
+from dashboard import ingest, queries
+from dashboard.snapshots import TableSnapshot
+
+from tests.conftest import OLD_TIMESTAMP
+
+PRODUCTS = queries.PRODUCTS.name
+
+
+def product(name, subsidiary="New Subsidiary", **values):
+    return dict(
+        SUBSIDIARY_NAME=subsidiary, BUSINESS_SEGMENT="Pharmaceuticals", PRODUCT_SERVICE_CATEGORY="Oncology",
+        PRODUCT_SERVICE_NAME=name, **values,
+    )
+
+
+def subsidiary(name, **values):
+    return dict(COMPANY_NAME=name, BUSINESS_SEGMENT="Pharmaceuticals", **values)
+
+
+def load(backend, spec, *records):
+    return ingest.ingest(backend, spec, [pd.DataFrame(list(records))])
+
+
+def product_row(backend, name):
+    frame = backend.query(
+        f"SELECT SUBSIDIARY_ID, DESCRIPTION, CREATED_DATE, LAST_UPDATED FROM {PRODUCTS} "
+        "WHERE PRODUCT_SERVICE_NAME = %(name)s",
+        {"name": name},
+    )
+    assert len(frame) == 1
+    return frame.iloc[0]
+
+
+def subsidiary_id(backend, name):
+    frame = backend.query("SELECT SUBSIDIARY_ID FROM Subsidiaries WHERE COMPANY_NAME = %(name)s", {"name": name})
+    return int(frame["SUBSIDIARY_ID"].iloc[0])
+
+
+def test_new_products_are_linked_to_a_known_subsidiary(backend):
+    result = load(backend, ingest.PRODUCTS, product("Linked", subsidiary="Genentech Inc."))
+
+    assert product_row(backend, "Linked")["SUBSIDIARY_ID"] == subsidiary_id(backend, "Genentech Inc.")
+    # The insert and the link
+    assert result.rows_written == 2
+
+
+def test_products_are_linked_once_their_subsidiary_is_loaded(backend):
+    load(backend, ingest.PRODUCTS, product("Early"))
+    assert pd.isna(product_row(backend, "Early")["SUBSIDIARY_ID"])
+    backend.execute(f"UPDATE {PRODUCTS} SET LAST_UPDATED = %(at)s", {"at": OLD_TIMESTAMP})
+
+    result = load(backend, ingest.SUBSIDIARIES, subsidiary("New Subsidiary"))
+
+    row = product_row(backend, "Early")
+    assert row["SUBSIDIARY_ID"] == subsidiary_id(backend, "New Subsidiary")
+    assert row["LAST_UPDATED"] > pd.Timestamp(OLD_TIMESTAMP)
+    assert result.rows_written == 2
+
+
+def test_incremental_refresh_sees_linked_products(backend):
+    load(backend, ingest.PRODUCTS, product("Early"))
+    backend.execute(f"UPDATE {PRODUCTS} SET LAST_UPDATED = %(at)s", {"at": OLD_TIMESTAMP})
+    snapshot = TableSnapshot(queries.PRODUCTS)
+    snapshot.refresh(backend)
+
+    load(backend, ingest.SUBSIDIARIES, subsidiary("New Subsidiary"))
+
+    assert snapshot.refresh(backend, max_age=0)
+    linked = snapshot.frame.loc[snapshot.frame["PRODUCT_SERVICE_NAME"] == "Early", "SUBSIDIARY_ID"]
+    assert linked.tolist() == [subsidiary_id(backend, "New Subsidiary")]
+
+
+def test_unchanged_records_are_not_rewritten(backend):
+    load(backend, ingest.PRODUCTS, product("Stable", subsidiary="Genentech Inc.", DESCRIPTION="Text"))
+    backend.execute(f"UPDATE {PRODUCTS} SET LAST_UPDATED = %(at)s", {"at": OLD_TIMESTAMP})
+
+    result = load(backend, ingest.PRODUCTS, product("Stable", subsidiary="Genentech Inc.", DESCRIPTION="Text"))
+
+    assert result.rows_written == 0
+    assert product_row(backend, "Stable")["LAST_UPDATED"] == pd.Timestamp(OLD_TIMESTAMP)
+
+
+def test_changed_records_keep_their_created_date(backend):
+    load(backend, ingest.PRODUCTS, product("Changing", subsidiary="Genentech Inc.", DESCRIPTION="Before"))
+    backend.execute(f"UPDATE {PRODUCTS} SET CREATED_DATE = %(at)s, LAST_UPDATED = %(at)s", {"at": OLD_TIMESTAMP})
+
+    result = load(backend, ingest.PRODUCTS, product("Changing", subsidiary="Genentech Inc.", DESCRIPTION="After"))
+
+    row = product_row(backend, "Changing")
+    assert result.rows_written == 1
+    assert row["DESCRIPTION"] == "After"
+    assert row["CREATED_DATE"] == pd.Timestamp(OLD_TIMESTAMP)
+    assert row["LAST_UPDATED"] > pd.Timestamp(OLD_TIMESTAMP)
+
+
+def test_records_without_a_natural_key_are_rejected(backend):
+    result = load(backend, ingest.SUBSIDIARIES, subsidiary("Kept"), subsidiary(None), subsidiary("Kept"))
+
+    assert result.rows_read == 3
+    assert result.rows_rejected == 1
+    assert subsidiary_id(backend, "Kept")
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".parquet"])
+def test_read_batches(tmp_path, suffix):
+    frame = pd.DataFrame([subsidiary(f"Company {i}") for i in range(5)])
+    path = tmp_path / f"records{suffix}"
+    if suffix == ".csv":
+        frame.to_csv(path, index=False)
+    elif suffix == ".jsonl":
+        frame.to_json(path, orient="records", lines=True)
+    else:
+        frame.to_parquet(path)
+
+    batches = list(ingest.read_batches(path, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert pd.concat(batches)["COMPANY_NAME"].tolist() == frame["COMPANY_NAME"].tolist()
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from dashboard import quality, queries
+
+SUBSIDIARIES = queries.SUBSIDIARIES.name
+PRODUCTS = queries.PRODUCTS.name
+
+
+def failed(report, table, check):
+    summary = report.summary.set_index(["TABLE", "CHECK"])
+    return int(summary.loc[(table, check), "FAILED"])
+
+
+def example_ids(report, table, check):
+    return report.examples[table, check]["ID"].tolist()
+
+
+@pytest.fixture
+def frames():
+    return {
+        SUBSIDIARIES: pd.DataFrame({
+            "SUBSIDIARY_ID": [1, 2, 3, 4],
+            "COMPANY_NAME": ["Alpha AG", "alpha  ag", "Beta Inc.", None],
+            "WEBSITE_URL": ["https://alpha.example", "not a url", "", None],
+            "DESCRIPTION_LENGTH": pd.array([80, 10, None, 60], dtype="Int64"),
+        }),
+        PRODUCTS: pd.DataFrame({
+            "PRODUCT_SERVICE_ID": [10, 11, 12, 13],
+            "SUBSIDIARY_NAME": ["Alpha AG", "Alpha AG", "Beta Inc.", "Gamma Ltd"],
+            "PRODUCT_SERVICE_NAME": ["Scanner", "scanner ", "Scanner", "Kit"],
+            "PRODUCT_URL": ["http://alpha.example/scanner", "ftp://alpha.example", None, "https://gamma.example/kit?x=1"],
+            "DESCRIPTION_LENGTH": pd.array([50, 49, 200, None], dtype="Int64"),
+        }),
+    }
+
+
+def test_checks_flag_the_failing_rows(frames):
+    report = quality.run_checks(frames)
+
+    # Blank and missing URLs and descriptions are left to the completeness metrics
+    assert example_ids(report, SUBSIDIARIES, "Invalid website URL") == [2]
+    assert example_ids(report, SUBSIDIARIES, "Short description") == [2]
+    # Case and spacing are ignored; a missing name duplicates nothing
+    assert example_ids(report, SUBSIDIARIES, "Duplicate company name") == [1, 2]
+    assert example_ids(report, PRODUCTS, "Invalid product URL") == [11]
+    assert example_ids(report, PRODUCTS, "Short description") == [11]
+    # The same name under another subsidiary is not a duplicate
+    assert example_ids(report, PRODUCTS, "Duplicate product name") == [10, 11]
+    assert example_ids(report, PRODUCTS, "Orphaned subsidiary name") == [13]
+
+
+def test_summary_has_a_row_per_check(frames):
+    report = quality.run_checks(frames)
+
+    assert len(report.summary) == len(quality.CHECKS)
+    row = report.summary.set_index(["TABLE", "CHECK"]).loc[(PRODUCTS, "Orphaned subsidiary name")]
+    assert (row["ROWS"], row["FAILED"], row["PASS_RATE"]) == (4, 1, 75.0)
+    assert report.failed_checks()[0] in {(SUBSIDIARIES, "Duplicate company name"), (PRODUCTS, "Duplicate product name")}
+    examples = report.examples[PRODUCTS, "Orphaned subsidiary name"]
+    assert examples.values.tolist() == [[13, "Kit", "Gamma Ltd"]]
+
+
+def test_passing_checks_have_no_examples(frames):
+    frames[PRODUCTS] = frames[PRODUCTS].iloc[:0]
+    report = quality.run_checks(frames)
+
+    assert failed(report, PRODUCTS, "Orphaned subsidiary name") == 0
+    assert (PRODUCTS, "Orphaned subsidiary name") not in report.examples
+    assert report.summary.set_index(["TABLE", "CHECK"]).loc[(PRODUCTS, "Short description"), "PASS_RATE"] == 100.0
+
+
+def test_build_report_reads_the_warehouse(backend):
+    baseline = quality.build_report(backend)
+    backend.execute(f"UPDATE {PRODUCTS} SET PRODUCT_URL = 'not a url', DESCRIPTION = 'Short' WHERE PRODUCT_SERVICE_ID = 2")
+    backend.execute(f"UPDATE {PRODUCTS} SET SUBSIDIARY_NAME = 'Nobody' WHERE PRODUCT_SERVICE_ID = 3")
+
+    report = quality.build_report(backend)
+    for check in ("Invalid product URL", "Short description", "Orphaned subsidiary name"):
+        assert failed(report, PRODUCTS, check) == failed(baseline, PRODUCTS, check) + 1
+    assert 2 in example_ids(report, PRODUCTS, "Invalid product URL")
+    assert 3 in example_ids(report, PRODUCTS, "Orphaned subsidiary name")
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from dashboard.result_cache import CacheEntry, CachingBackend, LocalRedis, MemoryStore, RedisStore, ResultCache
+
+
+class Loader:
+    """A load function that counts its calls and can be held until released."""
+
+    def __init__(self, value="value", hold=False):
+        self.value = value
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.value
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    store = MemoryStore() if request.param == "memory" else RedisStore(LocalRedis())
+    return ResultCache(store)
+
+
+def test_a_miss_loads_once_then_hits(cache):
+    load = Loader()
+    assert cache.get("key", load) == "value"
+    assert cache.get("key", load) == "value"
+    assert load.calls == 1
+    assert cache.summary()["misses"] == 1
+    assert cache.summary()["hits"] == 1
+
+
+def test_concurrent_misses_share_one_load(cache):
+    load = Loader(hold=True)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert load.started.wait(5)
+    time.sleep(0.05)
+    load.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["value"] * 8
+    assert load.calls == 1
+    assert cache.summary()["misses"] + cache.summary()["coalesced"] + cache.summary()["hits"] == 8
+
+
+def test_a_failed_load_is_not_cached(cache):
+    def fail():
+        raise RuntimeError("warehouse down")
+
+    with pytest.raises(RuntimeError):
+        cache.get("key", fail)
+    assert cache.get("key", Loader()) == "value"
+
+
+def test_stale_entries_are_served_while_revalidating(cache):
+    cache.store.set("key", CacheEntry("old", time.time() - 100))
+    load = Loader("new", hold=True)
+
+    # The stale value comes back at once; the replacement loads in the background
+    assert cache.get("key", load, max_age=10) == "old"
+    assert load.started.wait(5)
+    assert cache.get("key", load, max_age=10) == "old"
+    load.release.set()
+    deadline = time.monotonic() + 5
+    while cache.store.get("key").value != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.get("key", load, max_age=10) == "new"
+    assert load.calls == 1
+    assert cache.summary()["stale"] == 2
+
+
+def test_prefetch_loads_in_the_background_once(cache):
+    load = Loader(hold=True)
+    cache.prefetch("key", load)
+    cache.prefetch("key", load)
+    assert load.started.wait(5)
+    load.release.set()
+
+    assert cache.get("key", load) == "value"
+    cache.prefetch("key", load)
+    assert load.calls == 1
+
+
+def test_a_load_running_in_another_process_is_waited_for():
+    store = RedisStore(LocalRedis())
+    cache = ResultCache(store, load_timeout=5)
+    # Another process holds the entry's lock, then stores the value
+    assert store.lock("key", 5)
+    threading.Timer(0.1, lambda: store.set("key", CacheEntry("theirs", time.time()))).start()
+    load = Loader("ours")
+
+    assert cache.get("key", load) == "theirs"
+    assert load.calls == 0
+    assert cache.summary()["shared"] == 1
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_bytes=2500)
+    for key in "abc":
+        store.set(key, CacheEntry(np.zeros(100), time.time()))
+    store.get("a")
+    store.set("d", CacheEntry(np.zeros(100), time.time()))
+
+    assert "a" in store and "d" in store
+    assert "b" not in store
+    assert store.nbytes <= 2500
+
+
+def test_caching_backend_shares_results_per_scope():
+    class Backend:
+        queries = 0
+
+        def query(self, sql, params=None):
+            Backend.queries += 1
+            return params["x"]
+
+    cache = ResultCache()
+    first = CachingBackend(Backend(), cache, scope=1)
+    assert first.query("SELECT  %(x)s", {"x": 1}) == 1
+    assert CachingBackend(Backend(), cache, scope=1).query("SELECT %(x)s", {"x": 1}) == 1
+    assert Backend.queries == 1
+    CachingBackend(Backend(), cache, scope=2).query("SELECT %(x)s", {"x": 1})
+    assert Backend.queries == 2
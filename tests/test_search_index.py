@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.search_index import SearchIndex, field_weights
+
+COLUMNS = ("NAME", "DESCRIPTION")
+
+
+@pytest.fixture
+def index():
+    frame = pd.DataFrame({
+        "ID": [10, 20, 30, 40],
+        "NAME": ["Oncology Suite", "Cardiac Monitor", "Diagnostics Hub", None],
+        "DESCRIPTION": [
+            "Tools for oncologists",
+            "Heart monitoring for clinics",
+            "Lab diagnostics for oncology and cardiology",
+            "Diagnostics in the field",
+        ],
+    })
+    return SearchIndex.from_frame(frame, "ID", field_weights(COLUMNS))
+
+
+def test_terms_match_as_prefixes(index):
+    assert set(index.search("onco").tolist()) == {10, 30}
+    assert set(index.search("cardi").tolist()) == {20, 30}
+
+
+def test_terms_are_anded(index):
+    assert index.search("diagnostics onco").tolist() == [30]
+    assert index.count("diagnostics heart") == 0
+
+
+def test_name_matches_rank_first(index):
+    # "Oncology" is in row 10's name but only in row 30's description
+    assert index.search("oncology").tolist() == [10, 30]
+
+
+def test_empty_and_unknown_queries_match_nothing(index):
+    assert index.search("").tolist() == []
+    assert index.search("  !! ").tolist() == []
+    assert index.search("zzz").tolist() == []
+
+
+def test_mask_restricts_candidates(index):
+    mask = np.array([False, True, True, True])
+    assert index.search("onco", mask=mask).tolist() == [30]
+    assert index.count("diagnostics", mask=mask) == 2
+
+
+def test_limit_keeps_the_best_matches(index):
+    assert index.search("diagnostics", limit=1).tolist() == [index.search("diagnostics").tolist()[0]]
+    assert index.search("diagnostics", limit=0).tolist() == []
+
+
+def test_chunked_build_matches_a_single_chunk():
+    rng = np.random.default_rng(0)
+    words = np.array(["alpha", "beta", "gamma", "delta", "omega", "onco", "oncology"])
+    frame = pd.DataFrame({
+        "ID": np.arange(1, 201),
+        "NAME": [" ".join(rng.choice(words, 2)) for _ in range(200)],
+        "DESCRIPTION": [" ".join(rng.choice(words, 5)) for _ in range(200)],
+    })
+    whole = SearchIndex.from_frame(frame, "ID", field_weights(COLUMNS))
+    chunked = SearchIndex.from_frame(frame, "ID", field_weights(COLUMNS), chunk_size=7)
+
+    assert chunked.vocabulary == whole.vocabulary
+    for query in ("onco", "alpha beta", "om", "gamma delta omega"):
+        assert chunked.search(query).tolist() == whole.search(query).tolist()
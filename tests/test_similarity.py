@@ -0,0 +1,97 @@
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import similarity
+from dashboard.similarity import SimilarityIndex
+
+COLUMNS = ("NAME", "DESCRIPTION")
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "ID": [7, 3, 9, 1, 5],
+        "NAME": ["Tumour sequencing panel", "Insulin pump", "Tumour sequencing assay", "Glucose meter", "Lab robot"],
+        "DESCRIPTION": [
+            "Genomic profiling of solid tumours",
+            "Continuous insulin delivery for diabetes",
+            "Genomic profiling of tumours from blood",
+            "Blood glucose monitoring for diabetes",
+            None,
+        ],
+    })
+
+
+@pytest.fixture
+def index(frame):
+    return SimilarityIndex.from_frame(frame, "ID", COLUMNS)
+
+
+def test_the_closest_text_ranks_first(index):
+    assert [match_id for match_id, _ in index.similar(7)][0] == 9
+    assert [match_id for match_id, _ in index.similar(3)][0] == 1
+
+
+def test_a_product_is_not_similar_to_itself(index):
+    matches = index.similar(7, limit=10)
+    assert 7 not in [match_id for match_id, _ in matches]
+    assert len(matches) == len(index) - 1
+    scores = [score for _, score in matches]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_limit_and_mask(index):
+    assert len(index.similar(7, limit=2)) == 2
+    # Rows are in frame order; masking out the best match leaves the rest
+    mask = np.array([True, True, False, True, True])
+    assert 9 not in [match_id for match_id, _ in index.similar(7, mask=mask)]
+    assert index.similar(7, mask=np.zeros(len(index), dtype=bool)) == []
+
+
+def test_unknown_ids_and_empty_frames(frame, index):
+    assert index.similar(999) == []
+    empty = SimilarityIndex.from_frame(frame.iloc[:0], "ID", COLUMNS)
+    assert len(empty) == 0
+    assert empty.similar(7) == []
+
+
+def test_hashed_vectors_match_across_builds(frame, index):
+    again = SimilarityIndex.from_frame(frame, "ID", COLUMNS)
+    assert np.array_equal(again.vectors, index.vectors)
+    assert index.vectors.dtype == np.float32
+    assert index.vectors.shape == (len(frame), similarity.DIMENSIONS)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """A stand-in ``sentence_transformers`` module that records the models loaded."""
+    loaded = []
+
+    class SentenceTransformer:
+        def __init__(self, name):
+            loaded.append(name)
+
+        def encode(self, texts, normalize_embeddings, convert_to_numpy):
+            return np.eye(len(texts), 4)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=SentenceTransformer))
+    return loaded
+
+
+def test_a_configured_model_embeds_the_text(frame, fake_model, monkeypatch):
+    monkeypatch.setattr(similarity, "EMBEDDING_MODEL", "local-model")
+    index = SimilarityIndex.from_frame(frame, "ID", COLUMNS)
+    assert fake_model == ["local-model"]
+    assert index.vectors.shape == (len(frame), 4)
+    assert index.exact is None
+
+
+def test_without_a_model_tfidf_is_used(frame, fake_model, monkeypatch):
+    monkeypatch.setattr(similarity, "EMBEDDING_MODEL", None)
+    index = SimilarityIndex.from_frame(frame, "ID", COLUMNS)
+    assert fake_model == []
+    assert index.exact is not None
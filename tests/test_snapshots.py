@@ -0,0 +1,171 @@
+import pytest
+
+from dashboard import queries
+from dashboard.snapshots import TableSnapshot
+
+SPEC = queries.PRODUCTS
+TABLE = SPEC.name
+LATER = "2021-01-01 00:00:00"
+
+
+class CountingBackend:
+    """Passes everything to ``backend`` and counts the queries sent."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.queries = 0
+
+    def query(self, sql, params=None):
+        self.queries += 1
+        return self.backend.query(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+
+def table_ids(backend):
+    return sorted(queries.select_ids(backend, SPEC).tolist())
+
+
+def snapshot_ids(snapshot):
+    return sorted(snapshot.frame[SPEC.id_column].tolist())
+
+
+@pytest.fixture
+def snapshot(backend):
+    snapshot = TableSnapshot(SPEC)
+    assert snapshot.refresh(backend)
+    return snapshot
+
+
+def test_initial_load_mirrors_the_table(backend, snapshot):
+    assert snapshot_ids(snapshot) == table_ids(backend)
+    assert "DESCRIPTION" not in snapshot.frame.columns
+    assert list(snapshot.text.columns) == [SPEC.id_column, "DESCRIPTION", "KEY_FEATURES"]
+
+
+def test_refresh_without_changes_keeps_the_version(backend, snapshot):
+    version = snapshot.version
+    assert not snapshot.refresh(backend, max_age=0)
+    assert snapshot.version == version
+
+
+def test_refresh_picks_up_inserted_rows(backend, snapshot):
+    backend.execute(f"""
+        INSERT INTO {TABLE} (SUBSIDIARY_NAME, BUSINESS_SEGMENT, PRODUCT_SERVICE_CATEGORY, PRODUCT_SERVICE_NAME,
+                             DESCRIPTION, CREATED_DATE, LAST_UPDATED)
+        VALUES ('Genentech Inc.', 'Pharmaceuticals', 'Oncology', 'New product', 'New text', %(at)s, %(at)s)
+    """, {"at": LATER})
+    version = snapshot.version
+
+    assert snapshot.refresh(backend, max_age=0)
+    assert snapshot.version != version
+    assert snapshot_ids(snapshot) == table_ids(backend)
+    new_id = max(table_ids(backend))
+    assert snapshot.text_by_id([new_id])["DESCRIPTION"].tolist() == ["New text"]
+
+
+def test_refresh_picks_up_updated_rows(backend, snapshot):
+    backend.execute(
+        f"UPDATE {TABLE} SET DESCRIPTION = 'Edited', TARGET_MARKET = 'Everyone', LAST_UPDATED = %(at)s "
+        f"WHERE {SPEC.id_column} = 2",
+        {"at": LATER},
+    )
+
+    assert snapshot.refresh(backend, max_age=0)
+    row = snapshot.frame.set_index(SPEC.id_column).loc[2]
+    assert row["TARGET_MARKET"] == "Everyone"
+    assert snapshot.text_by_id([2])["DESCRIPTION"].tolist() == ["Edited"]
+    assert snapshot_ids(snapshot) == table_ids(backend)
+
+
+def test_refresh_picks_up_rows_rewritten_at_the_high_water_mark(backend, snapshot):
+    # A second write within the same second keeps LAST_UPDATED where it was
+    backend.execute(
+        f"UPDATE {TABLE} SET TARGET_MARKET = 'Everyone', LAST_UPDATED = %(at)s WHERE {SPEC.id_column} = 2",
+        {"at": str(snapshot.high_water_mark)},
+    )
+    version = snapshot.version
+
+    assert snapshot.refresh(backend, max_age=0)
+    assert snapshot.version != version
+    assert snapshot.frame.set_index(SPEC.id_column).loc[2, "TARGET_MARKET"] == "Everyone"
+    assert not snapshot.refresh(backend, max_age=0)
+
+
+def test_refresh_detects_deleted_rows(backend, snapshot):
+    # A delete leaves no LAST_UPDATED behind; the count/id-sum fingerprint catches it
+    backend.execute(f"DELETE FROM {TABLE} WHERE {SPEC.id_column} = 3")
+
+    assert snapshot.refresh(backend, max_age=0)
+    assert 3 not in snapshot_ids(snapshot)
+    assert snapshot_ids(snapshot) == table_ids(backend)
+    assert snapshot.text_by_id([3]).empty
+
+
+def test_refresh_is_throttled(backend, snapshot):
+    counting = CountingBackend(backend)
+    assert not snapshot.refresh(counting)
+    assert counting.queries == 0
+
+
+def test_text_by_id_keeps_the_requested_order(snapshot):
+    text = snapshot.text_by_id([5, 1, 999_999, 3])
+    assert text[SPEC.id_column].tolist() == [5, 1, 3]
+
+
+def test_reload_from_disk(backend, tmp_path):
+    saved = TableSnapshot(SPEC, directory=tmp_path)
+    assert saved.refresh(backend)
+    assert saved.path.exists()
+
+    reloaded = TableSnapshot(SPEC, directory=tmp_path)
+    counting = CountingBackend(backend)
+    # The disk copy is served, then revalidated once: nothing changed, so nothing is reloaded
+    assert not reloaded.refresh(counting)
+    assert counting.queries > 0
+    assert reloaded.version == saved.version
+    assert snapshot_ids(reloaded) == snapshot_ids(saved)
+    assert reloaded.text_by_id([1]).equals(saved.text_by_id([1]))
+
+
+def test_reload_from_disk_applies_changes_made_since(backend, tmp_path):
+    assert TableSnapshot(SPEC, directory=tmp_path).refresh(backend)
+    backend.execute(f"UPDATE {TABLE} SET DESCRIPTION = 'Edited', LAST_UPDATED = %(at)s WHERE {SPEC.id_column} = 1",
+                    {"at": LATER})
+    backend.execute(f"DELETE FROM {TABLE} WHERE {SPEC.id_column} = 2")
+
+    reloaded = TableSnapshot(SPEC, directory=tmp_path)
+    assert reloaded.refresh(backend)
+    assert reloaded.text_by_id([1])["DESCRIPTION"].tolist() == ["Edited"]
+    assert snapshot_ids(reloaded) == table_ids(backend)
+
+
+def test_refresh_is_throttled_after_a_save(backend, tmp_path):
+    snapshot = TableSnapshot(SPEC, directory=tmp_path)
+    assert snapshot.refresh(backend)
+    backend.execute(f"UPDATE {TABLE} SET DESCRIPTION = 'Edited', LAST_UPDATED = %(at)s WHERE {SPEC.id_column} = 1",
+                    {"at": LATER})
+    assert snapshot.refresh(backend, max_age=0)
+
+    # Saving re-maps the file; that must not reset the last check
+    counting = CountingBackend(backend)
+    assert not snapshot.refresh(counting)
+    assert counting.queries == 0
+
+
+def test_workers_share_one_snapshot_file(backend, tmp_path):
+    first, second = TableSnapshot(SPEC, directory=tmp_path), TableSnapshot(SPEC, directory=tmp_path)
+    assert first.refresh(backend)
+    assert not second.refresh(backend)
+    backend.execute(f"UPDATE {TABLE} SET DESCRIPTION = 'Edited', LAST_UPDATED = %(at)s WHERE {SPEC.id_column} = 1",
+                    {"at": LATER})
+
+    assert first.refresh(backend, max_age=0)
+    written = first.path.stat()
+    # The second worker finds the file already holds the new data and maps it instead of rewriting it
+    assert second.refresh(backend, max_age=0)
+    assert second.path.stat().st_ino == written.st_ino
+    assert second.path.stat().st_mtime_ns == written.st_mtime_ns
+    assert second.version == first.version
+    assert second.text_by_id([1])["DESCRIPTION"].tolist() == ["Edited"]